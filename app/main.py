@@ -1,42 +1,438 @@
-from flask import Flask, render_template, request, redirect, url_for, flash, session
+from flask import Flask, render_template, request, redirect, url_for, flash, session, Response, stream_with_context, jsonify, g, has_request_context, abort
+from flask import before_render_template, template_rendered
 from flask_sqlalchemy import SQLAlchemy
+from flask_sqlalchemy.session import Session as FlaskSession
+from jinja2 import FileSystemBytecodeCache
+from markupsafe import Markup
+from sqlalchemy import event, func
+from sqlalchemy.engine import Engine
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.sql import operators
+from werkzeug.security import check_password_hash, generate_password_hash
 from datetime import datetime, timedelta, date
+from decimal import Decimal, ROUND_HALF_EVEN
+from collections import OrderedDict, namedtuple
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from functools import wraps
+from itertools import chain
 import calendar
+import csv
+import hashlib
+import io
+import json
 import os
 import math
+import multiprocessing
+import re
+import secrets
+import sqlite3
+import stat
+import threading
+import time
+
+import numpy as np
 
 app = Flask(__name__)
-app.secret_key = "finance_strategy_engine_secret"
+# Compiled templates are cached on disk so fresh workers skip the Jinja compile step.
+# Cached bytecode gets executed, so the dir must be ours alone: Jinja's default
+# per-user temp dir checks that, and so does private_dir for JINJA_CACHE_DIR.
+def private_dir(path):
+    """Create `path` as 0700, or accept it if it already exists owned by us with no group/other access."""
+    try:
+        os.makedirs(path, mode=0o700)
+    except FileExistsError:
+        pass
+    st = os.lstat(path)
+    if not stat.S_ISDIR(st.st_mode) or st.st_uid != os.getuid() or st.st_mode & 0o077:
+        raise RuntimeError(f"{path} must be a directory owned by this user with mode 0700")
+    return path
+
+if os.environ.get("JINJA_CACHE_DIR"):
+    app.jinja_env.bytecode_cache = FileSystemBytecodeCache(private_dir(os.environ["JINJA_CACHE_DIR"]))
+else:
+    app.jinja_env.bytecode_cache = FileSystemBytecodeCache()
+
+def warm_templates():
+    """Load every template once (gunicorn calls this in the master so forked workers inherit them)."""
+    for name in app.jinja_env.list_templates(extensions=["html"]):
+        app.jinja_env.get_template(name)
 
 # ---------------- DB ----------------
-db_path = os.path.join(os.path.dirname(__file__), 'data', 'strategy.db')
+db_path = os.environ.get("MADFINANCE_DB") or os.path.join(os.path.dirname(__file__), 'data', 'strategy.db')
 os.makedirs(os.path.dirname(db_path), exist_ok=True)
 
+def _persistent_secret_key():
+    # made once per data dir, so sessions survive restarts and are shared by every worker
+    path = os.path.join(os.path.dirname(db_path), "secret_key")
+    try:
+        fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+    except FileExistsError:
+        with open(path, "rb") as fh:
+            return fh.read()
+    key = secrets.token_bytes(32)
+    with os.fdopen(fd, "wb") as fh:
+        fh.write(key)
+    return key
+
+# the session cookie decides which households a browser may open, so the key must never be a known string
+app.secret_key = os.environ.get("SECRET_KEY") or _persistent_secret_key()
+
 app.config['SQLALCHEMY_DATABASE_URI'] = f'sqlite:///{db_path}'
 app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
-db = SQLAlchemy(app)
+# One small pool per worker process; connections are shared across request threads.
+app.config['SQLALCHEMY_ENGINE_OPTIONS'] = {
+    "pool_size": int(os.environ.get("DB_POOL_SIZE", 5)),
+    "max_overflow": int(os.environ.get("DB_MAX_OVERFLOW", 10)),
+    "pool_recycle": 3600,
+    "connect_args": {"check_same_thread": False},
+}
+
+class HouseholdSession(FlaskSession):
+    """db.session that sends every statement to the active household's engine (see HOUSEHOLDS)."""
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is not None:
+            return bind
+        return current_household().engine
+
+db = SQLAlchemy(app, session_options={"class_": HouseholdSession})
+
+SQLITE_BUSY_TIMEOUT_MS = 5000
+
+@event.listens_for(Engine, "connect")
+def _sqlite_pragmas(dbapi_conn, conn_record):
+    # WAL lets readers keep going while a schedule write is in flight;
+    # NORMAL sync is safe under WAL and skips an fsync per commit.
+    if not isinstance(dbapi_conn, sqlite3.Connection):
+        return
+    cur = dbapi_conn.cursor()
+    cur.execute("PRAGMA journal_mode=WAL")
+    cur.execute("PRAGMA synchronous=NORMAL")
+    cur.execute(f"PRAGMA busy_timeout={SQLITE_BUSY_TIMEOUT_MS}")
+    cur.close()
+
+# ---------------- METRICS ----------------
+# Per-request wall time, SQL query count/time, simulation time and template render time.
+# Exported at /metrics (Prometheus text format) and as a Server-Timing header.
+# Each worker process keeps its own counts. Under gunicorn (METRICS_DIR, set by
+# gunicorn.conf.py) every worker also dumps them to METRICS_DIR/<pid>.json every
+# few seconds, and whichever worker is scraped merges all the files, so /metrics
+# shows whole-server totals. Files of workers that exited stay so counters never
+# go backwards. Without METRICS_DIR (dev server, tests) it's this process only.
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_COUNT_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 250)
+METRICS_DIR = os.environ.get("METRICS_DIR")
+METRICS_FLUSH_SECONDS = 5.0
+
+class Histogram:
+    """Cumulative-bucket histogram keyed by a label tuple."""
+
+    def __init__(self, name, help_text, label_names, buckets):
+        self.name = name
+        self.help_text = help_text
+        self.label_names = label_names
+        self.buckets = buckets
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, labels, value):
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [[0] * len(self.buckets), 0, 0.0]
+            counts = series[0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    counts[i] += 1
+                    break
+            series[1] += 1
+            series[2] += value
+
+    def state(self):
+        # JSON-ready: [[labels, bucket counts, count, sum], ...]
+        with self._lock:
+            return [[list(k), list(v[0]), v[1], v[2]] for k, v in self._series.items()]
+
+    @staticmethod
+    def merge(states):
+        """Sum state() lists from several processes into {labels: [counts, count, sum]}."""
+        merged = {}
+        for state in states:
+            for labels, counts, total, sum_ in state:
+                series = merged.setdefault(tuple(labels), [[0] * len(counts), 0, 0.0])
+                series[0] = [a + b for a, b in zip(series[0], counts)]
+                series[1] += total
+                series[2] += sum_
+        return merged
+
+    def render(self, series=None):
+        """Prometheus lines for `series` (from merge), or for this process's own counts."""
+        if series is None:
+            series = self.merge([self.state()])
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        for labels, (counts, total, sum_) in sorted(series.items()):
+            base = ",".join(f'{n}="{v}"' for n, v in zip(self.label_names, labels))
+            sep = "," if base else ""
+            running = 0
+            for bound, c in zip(self.buckets, counts):
+                running += c
+                lines.append(f'{self.name}_bucket{{{base}{sep}le="{bound}"}} {running}')
+            lines.append(f'{self.name}_bucket{{{base}{sep}le="+Inf"}} {total}')
+            lines.append(f"{self.name}_sum{{{base}}} {sum_:.6f}")
+            lines.append(f"{self.name}_count{{{base}}} {total}")
+        return lines
+
+REQUEST_SECONDS = Histogram("madfinance_request_duration_seconds", "Request wall time.",
+                            ("endpoint", "method", "status"), LATENCY_BUCKETS)
+REQUEST_QUERIES = Histogram("madfinance_request_db_queries", "SQL statements executed per request.",
+                            ("endpoint",), QUERY_COUNT_BUCKETS)
+PHASE_SECONDS = Histogram("madfinance_request_phase_seconds", "Time per request spent in db, sim and render.",
+                          ("endpoint", "phase"), LATENCY_BUCKETS)
+
+METRIC_PHASES = ("db", "sim", "render")
+
+def _request_metrics():
+    # None outside a request (CLI, startup, background threads) so the hooks are no-ops there
+    if not has_request_context():
+        return None
+    return g.get("_metrics")
+
+def timed_phase(phase):
+    """Add the wrapped call's wall time to the current request's `phase` bucket (outermost call only)."""
+    def decorator(fn):
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            m = _request_metrics()
+            if m is None or m["depth"].get(phase):
+                return fn(*args, **kwargs)
+            m["depth"][phase] = 1
+            t0 = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                m[phase] += time.perf_counter() - t0
+                m["depth"][phase] = 0
+        return wrapper
+    return decorator
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _query_started(conn, cursor, statement, parameters, context, executemany):
+    m = _request_metrics()
+    if m is not None:
+        m["query_start"] = time.perf_counter()
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _query_finished(conn, cursor, statement, parameters, context, executemany):
+    m = _request_metrics()
+    if m is not None and m["query_start"] is not None:
+        m["db"] += time.perf_counter() - m["query_start"]
+        m["queries"] += 1
+        m["query_start"] = None
+
+@before_render_template.connect_via(app)
+def _render_started(sender, template, context, **extra):
+    m = _request_metrics()
+    if m is not None:
+        m["render_start"] = time.perf_counter()
+
+@template_rendered.connect_via(app)
+def _render_finished(sender, template, context, **extra):
+    m = _request_metrics()
+    if m is not None and m["render_start"] is not None:
+        m["render"] += time.perf_counter() - m["render_start"]
+        m["render_start"] = None
+
+@app.before_request
+def _start_request_metrics():
+    g._metrics = {"start": time.perf_counter(), "queries": 0, "db": 0.0, "sim": 0.0, "render": 0.0,
+                  "query_start": None, "render_start": None, "depth": {}}
+
+@app.after_request
+def _finish_request_metrics(response):
+    m = _request_metrics()
+    if m is None or request.endpoint == "metrics":
+        return response
+    if METRICS_DIR:
+        _start_metrics_flusher()
+    total = time.perf_counter() - m["start"]
+    endpoint = request.endpoint or "unmatched"
+    REQUEST_SECONDS.observe((endpoint, request.method, str(response.status_code)), total)
+    REQUEST_QUERIES.observe((endpoint,), m["queries"])
+    for phase in METRIC_PHASES:
+        PHASE_SECONDS.observe((endpoint, phase), m[phase])
+    # streamed bodies (export/projection) are still being produced, so "total" there is time-to-headers
+    response.headers["Server-Timing"] = ", ".join(
+        [f'db;dur={m["db"] * 1000:.1f};desc="{m["queries"]} queries"']
+        + [f"{phase};dur={m[phase] * 1000:.1f}" for phase in METRIC_PHASES[1:]]
+        + [f"total;dur={total * 1000:.1f}"]
+    )
+    return response
+
+HISTOGRAMS = (REQUEST_SECONDS, REQUEST_QUERIES, PHASE_SECONDS)
+
+def _metric_caches():
+    return (("sim", sim_cache), ("fragment", fragment_cache), ("household_engine", households.engines))
+
+def _metrics_state():
+    return {
+        "pid": os.getpid(),
+        "histograms": {h.name: h.state() for h in HISTOGRAMS},
+        "caches": {prefix: cache.stats() for prefix, cache in _metric_caches()},
+    }
+
+def flush_metrics():
+    """Write this process's counts to METRICS_DIR/<pid>.json (atomically, via rename)."""
+    path = os.path.join(METRICS_DIR, f"{os.getpid()}.json")
+    with open(path + ".tmp", "w") as fh:
+        json.dump(_metrics_state(), fh)
+    os.replace(path + ".tmp", path)
+
+_flusher_pid = None
+_flusher_lock = threading.Lock()
+
+def _start_metrics_flusher():
+    # one thread per worker, started on its first request (threads don't survive gunicorn's fork)
+    global _flusher_pid
+    with _flusher_lock:
+        if _flusher_pid == os.getpid():
+            return
+        _flusher_pid = os.getpid()
+
+    def run():
+        while True:
+            time.sleep(METRICS_FLUSH_SECONDS)
+            try:
+                flush_metrics()
+            except OSError:
+                app.logger.exception("metrics flush to %s failed", METRICS_DIR)
+
+    threading.Thread(target=run, name="metrics-flush", daemon=True).start()
+
+def _pid_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+def _worker_states():
+    if not METRICS_DIR:
+        return [_metrics_state()]
+    flush_metrics()  # our own file, fresh
+    states = []
+    for name in os.listdir(METRICS_DIR):
+        if not name.endswith(".json"):
+            continue
+        try:
+            with open(os.path.join(METRICS_DIR, name)) as fh:
+                states.append(json.load(fh))
+        except (OSError, ValueError):
+            continue  # a worker mid-rename; it's picked up on the next scrape
+    return states
+
+@app.route("/metrics")
+def metrics():
+    states = _worker_states()
+    lines = []
+    for hist in HISTOGRAMS:
+        lines.extend(hist.render(Histogram.merge(s["histograms"].get(hist.name, []) for s in states)))
+    live = [s for s in states if s["pid"] == os.getpid() or _pid_alive(s["pid"])]
+    for prefix, _ in _metric_caches():
+        for key, kind in (("hits", "counter"), ("misses", "counter"), ("size", "gauge")):
+            # counters add up over every worker that ever ran; sizes only over the live ones
+            value = sum(s["caches"].get(prefix, {}).get(key, 0) for s in (live if kind == "gauge" else states))
+            name = f"madfinance_{prefix}_cache_{key}" + ("_total" if kind == "counter" else "")
+            lines.append(f"# TYPE {name} {kind}")
+            lines.append(f"{name} {value}")
+    return Response("\n".join(lines) + "\n", mimetype="text/plain; version=0.0.4")
 
 # ---------------- MODELS ----------------
 
+def to_units(value, scale):
+    """
+    Float, str or Decimal -> int count of 1/scale units, rounded half to even
+    on the decimal as written (2.675 dollars is 268 cents, not binary 267).
+    Every dollars/APR/percent -> int conversion goes through here.
+    """
+    return int((Decimal(str(value)) * scale).to_integral_value(rounding=ROUND_HALF_EVEN))
+
+def to_cents(value):
+    """Dollars -> int cents, half-even on the third decimal."""
+    return to_units(value, 100)
+
+def units_array(values, scale):
+    """
+    to_units over a sequence, as an int64 array. np.rint is half-even too and
+    agrees with it away from ties; the few values whose binary product lands
+    near one (or that are too big for the check) go through to_units.
+    """
+    if len(values) <= 16:
+        # a handful of values is quicker one by one
+        return np.array([to_units(v, scale) for v in values], dtype=np.int64)
+    x = np.asarray(values, dtype=np.float64) * scale
+    out = np.rint(x)
+    near = (np.abs(np.abs(x - out) - 0.5) < 1e-6) | ~(np.abs(x) < 2.0 ** 30)
+    out = out.astype(np.int64)
+    for i in np.flatnonzero(near).tolist():
+        out[i] = to_units(values[i], scale)
+    return out
+
+class Money(db.TypeDecorator):
+    """
+    Money column: stored as INTEGER cents, read back as float dollars
+    (always a whole number of cents). SQL arithmetic on the column sees
+    cents, so aggregates go through raw_cents() and get scaled in Python.
+    """
+    impl = db.Integer
+    cache_ok = True
+
+    def process_bind_param(self, value, dialect):
+        return None if value is None else to_cents(value)
+
+    def process_result_value(self, value, dialect):
+        return None if value is None else value / 100
+
+    def coerce_compared_value(self, op, value):
+        # comparisons take dollars; arithmetic operands (Bill.amount * 52) are plain numbers
+        if operators.is_comparison(op):
+            return self
+        return db.Float() if isinstance(value, float) else db.Integer()
+
+def raw_cents(col):
+    # the stored integer, without the dollars conversion
+    return db.type_coerce(col, db.Integer)
+
 class Income(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(100), nullable=False)
-    amount = db.Column(db.Float, nullable=False)
+    amount = db.Column(Money, nullable=False)
     frequency = db.Column(db.String(50), nullable=False)  # Monthly, Bi-weekly, Weekly
     next_pay_date = db.Column(db.Date, nullable=True)
 
 class Bill(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(100), nullable=False)
-    amount = db.Column(db.Float, nullable=False)
-    due_date = db.Column(db.Date, nullable=True)
+    amount = db.Column(Money, nullable=False)
+    due_date = db.Column(db.Date, nullable=True, index=True)
+    # due_date anchors the recurrence; see BILL_FREQUENCIES
+    frequency = db.Column(db.String(50), nullable=False, default="Monthly", server_default="Monthly")
 
 class Debt(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(100), nullable=False)
-    balance = db.Column(db.Float, nullable=False)
+    balance = db.Column(Money, nullable=False)
     interest_rate = db.Column(db.Float, nullable=False)  # APR %
-    min_payment = db.Column(db.Float, nullable=False)
+    min_payment = db.Column(Money, nullable=False)
+    # variable-rate APRs follow the index-rate drift in the Monte Carlo risk mode
+    variable_rate = db.Column(db.Boolean, nullable=False, default=False, server_default="0")
+    # optional inputs for the payoff strategies (see STRATEGIES)
+    priority = db.Column(db.Integer, nullable=True)  # custom order, 1 = pay first
+    promo_rate = db.Column(db.Float, nullable=True)  # APR % charged through promo_end, then interest_rate
+    promo_end = db.Column(db.Date, nullable=True)
+    split_pct = db.Column(db.Float, nullable=True)  # share of the extra for split allocation
 
 class PlannedPayment(db.Model):
     """
@@ -44,26 +440,192 @@ class PlannedPayment(db.Model):
     Ex: 02/01/2026 : BHG Loan : $400
     """
     id = db.Column(db.Integer, primary_key=True)
-    pay_date = db.Column(db.Date, nullable=False)
+    pay_date = db.Column(db.Date, nullable=False, index=True)
     name = db.Column(db.String(140), nullable=False)  # "BHG Loan", "Trash", etc
-    amount = db.Column(db.Float, nullable=False)
+    amount = db.Column(Money, nullable=False)
     kind = db.Column(db.String(30), nullable=False, default="debt")  # debt, bill, other (for filtering/colors)
 
+class MonthlyRollup(db.Model):
+    """
+    Planned totals per (month, kind), kept in step with PlannedPayment writes
+    so month summaries don't re-scan the schedule.
+    """
+    month = db.Column(db.String(7), primary_key=True)  # YYYY-MM
+    kind = db.Column(db.String(30), primary_key=True)
+    total = db.Column(Money, nullable=False, default=0)
+    count = db.Column(db.Integer, nullable=False, default=0)
+
+class DataVersion(db.Model):
+    """Single row, bumped in every transaction that writes app data (drives API ETags)."""
+    id = db.Column(db.Integer, primary_key=True)
+    version = db.Column(db.Integer, nullable=False, default=0)
+
+class ProjectionSnapshot(db.Model):
+    """Latest payoff projection per strategy key, recomputed in the background."""
+    key = db.Column(db.String(80), primary_key=True)  # the extra payment, or "auto" = leftover cashflow
+    inputs_hash = db.Column(db.String(32), nullable=False)
+    payload = db.Column(db.Text, nullable=False)  # JSON
+    computed_at = db.Column(db.DateTime, nullable=False)
+    compute_ms = db.Column(db.Float, nullable=False, default=0.0)
+    viewed_at = db.Column(db.DateTime)  # last served to a page; old override keys are pruned by it
+
 class Setting(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     key = db.Column(db.String(80), unique=True, nullable=False)
     value = db.Column(db.String(200), nullable=False)
 
+def init_schema(engine):
+    """Create and migrate one household database (the engine's SQLite file)."""
+    db.metadata.create_all(engine)
+    migrate_schema(engine)
+
+def migrate_schema(engine):
+    """
+    create_all() only builds missing tables, so columns and indexes declared
+    on models that already exist in an older strategy.db are added here.
+    """
+    inspector = db.inspect(engine)
+    with engine.begin() as conn:
+        for table in db.metadata.sorted_tables:
+            existing = {c["name"] for c in inspector.get_columns(table.name)}
+            for col in table.columns:
+                if col.name in existing:
+                    continue
+                # SQLite can only add NOT NULL columns that carry a default
+                ddl = f"ALTER TABLE {table.name} ADD COLUMN {col.name} {col.type.compile(dialect=engine.dialect)}"
+                if col.server_default is not None:
+                    ddl += f" NOT NULL DEFAULT '{col.server_default.arg}'"
+                conn.execute(db.text(ddl))
+    migrate_money_columns(engine)
+    for table in db.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(bind=engine, checkfirst=True)
+
+    # first run with the rollup table: build it from whatever is already scheduled
+    with engine.begin() as conn:
+        if conn.execute(db.select(MonthlyRollup.month).limit(1)).first() is None:
+            rebuild_monthly_rollups(conn)
+        # snapshots used to be keyed "method|extra" too; they're only a cache, so drop those
+        conn.execute(db.delete(ProjectionSnapshot).where(ProjectionSnapshot.key.contains("|")))
+
+def migrate_money_columns(engine):
+    """
+    Older strategy.db files keep money as REAL dollars. SQLite can't change a
+    column's type in place, so each such table is rebuilt with INTEGER cents
+    (rename, create, copy through to_cents, drop) in one transaction.
+    SQLite's own ROUND() goes half away from zero on the binary value, so the
+    copy calls to_cents itself.
+    """
+    inspector = db.inspect(engine)
+    with engine.begin() as conn:
+        conn.connection.driver_connection.create_function(
+            "to_cents", 1, lambda v: None if v is None else to_cents(v), deterministic=True
+        )
+        for table in db.metadata.sorted_tables:
+            money = {c.name for c in table.columns if isinstance(c.type, Money)}
+            declared = {c["name"]: c["type"] for c in inspector.get_columns(table.name)}
+            if all(isinstance(declared[name], db.Integer) for name in money):
+                continue
+            old = f"{table.name}_dollars"
+            conn.execute(db.text(f"ALTER TABLE {table.name} RENAME TO {old}"))
+            # the renamed table keeps its index names; free them for the new table
+            for (index,) in conn.execute(db.text(
+                "SELECT name FROM sqlite_master WHERE type = 'index' AND tbl_name = :t AND sql IS NOT NULL"
+            ), {"t": old}):
+                conn.execute(db.text(f"DROP INDEX {index}"))
+            table.create(conn)
+            names = [c.name for c in table.columns]
+            values = [f"to_cents({n})" if n in money else n for n in names]
+            conn.execute(db.text(
+                f"INSERT INTO {table.name} ({', '.join(names)}) SELECT {', '.join(values)} FROM {old}"
+            ))
+            conn.execute(db.text(f"DROP TABLE {old}"))
+
+# ---------- Monthly rollups ----------
+
+def _rollup_month(pay_date):
+    return pay_date.strftime("%Y-%m")
+
+def apply_rollup_deltas(conn, deltas):
+    """Add {(month, kind): (total cents, count)} onto MonthlyRollup in the caller's transaction."""
+    for (month, kind), (total, count) in deltas.items():
+        stmt = sqlite_insert(MonthlyRollup).values(month=month, kind=kind, total=db.literal(total, db.Integer), count=count)
+        conn.execute(stmt.on_conflict_do_update(
+            index_elements=[MonthlyRollup.month, MonthlyRollup.kind],
+            set_={"total": MonthlyRollup.total + stmt.excluded.total,
+                  "count": MonthlyRollup.count + stmt.excluded.count},
+        ))
+
+def planned_rollup_deltas(rows, sign=1):
+    deltas = {}
+    for pay_date, kind, amount in rows:
+        key = (_rollup_month(pay_date), kind or "debt")
+        total, count = deltas.get(key, (0, 0))
+        deltas[key] = (total + sign * to_cents(amount), count + sign)
+    return deltas
+
+def _merge_deltas(into, more):
+    for key, (total, count) in more.items():
+        t, c = into.get(key, (0, 0))
+        into[key] = (t + total, c + count)
+    return into
+
+def rebuild_monthly_rollups(conn):
+    # recompute every rollup row from the schedule, in the caller's transaction
+    month_key = func.strftime("%Y-%m", PlannedPayment.pay_date)
+    conn.execute(db.delete(MonthlyRollup))
+    conn.execute(db.insert(MonthlyRollup).from_select(
+        ["month", "kind", "total", "count"],
+        db.select(month_key, PlannedPayment.kind, func.sum(PlannedPayment.amount), func.count())
+        .group_by(month_key, PlannedPayment.kind),
+    ))
+
+@event.listens_for(db.session, "after_flush")
+def _update_monthly_rollups(session, flush_context):
+    # runs inside the flush's transaction, so the rollup commits (or rolls back) with the rows
+    deltas = {}
+    for obj in session.new:
+        if isinstance(obj, PlannedPayment):
+            _merge_deltas(deltas, planned_rollup_deltas([(obj.pay_date, obj.kind, obj.amount)]))
+    for obj in session.deleted:
+        if isinstance(obj, PlannedPayment):
+            _merge_deltas(deltas, planned_rollup_deltas([(obj.pay_date, obj.kind, obj.amount)], -1))
+    for obj in session.dirty:
+        if not isinstance(obj, PlannedPayment) or not session.is_modified(obj):
+            continue
+        state = db.inspect(obj)
+        old = []
+        for attr in ("pay_date", "kind", "amount"):
+            hist = state.attrs[attr].history
+            old.append(hist.deleted[0] if hist.deleted else getattr(obj, attr))
+        _merge_deltas(deltas, planned_rollup_deltas([tuple(old)], -1))
+        _merge_deltas(deltas, planned_rollup_deltas([(obj.pay_date, obj.kind, obj.amount)]))
+    if deltas:
+        apply_rollup_deltas(session.connection(), deltas)
+
+def planned_rollup(first, last):
+    """{YYYY-MM: {kind: total}} for the months touching [first, last]."""
+    out = {}
+    rows = db.session.execute(
+        db.select(MonthlyRollup.month, MonthlyRollup.kind, MonthlyRollup.total)
+        .where(MonthlyRollup.month >= _rollup_month(first), MonthlyRollup.month <= _rollup_month(last))
+    )
+    for month, kind, total in rows:
+        out.setdefault(month, {})[kind] = float(total)
+    return out
+
 with app.app_context():
-    db.create_all()
+    init_schema(db.engine)  # the default household; others are migrated when first opened
 
 # ---------------- HELPERS ----------------
 
 def _to_float(val, default=None):
     try:
-        return float(val)
+        val = float(val)
     except Exception:
         return default
+    # nan/inf have no place in a money column (or anywhere else here)
+    return val if math.isfinite(val) else default
 
 def _parse_date(val):
     if not val:
@@ -73,18 +635,85 @@ def _parse_date(val):
     except Exception:
         return None
 
+class SettingsStore:
+    """
+    In-process copy of the Setting table.
+    Reads are served from memory. Every write bumps a version row, and other
+    workers re-check that row at most every `recheck_seconds` and reload the
+    table when it moved.
+    """
+    VERSION_KEY = "__version__"
+
+    def __init__(self, recheck_seconds=2.0):
+        self.recheck_seconds = recheck_seconds
+        self._values = None
+        self._version = None
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+
+    def _db_version(self):
+        v = db.session.execute(db.select(Setting.value).filter_by(key=self.VERSION_KEY)).scalar()
+        return int(v) if v is not None else 0
+
+    def _load(self):
+        values = dict(db.session.execute(db.select(Setting.key, Setting.value)).all())
+        self._version = int(values.pop(self.VERSION_KEY, 0) or 0)
+        self._values = values
+        self._checked_at = time.monotonic()
+
+    def _refresh(self):
+        if self._values is None:
+            self._load()
+            return
+        now = time.monotonic()
+        if now - self._checked_at >= self.recheck_seconds:
+            self._checked_at = now
+            if self._db_version() != self._version:
+                self._load()
+
+    def get(self, key, default=None):
+        with self._lock:
+            self._refresh()
+            return self._values.get(key, default)
+
+    def set_many(self, values):
+        """Upsert all keys and bump the version row in one transaction."""
+        values = {k: str(v) for k, v in values.items()}
+        with self._lock:
+            if values:
+                stmt = sqlite_insert(Setting).values([{"key": k, "value": v} for k, v in values.items()])
+                db.session.execute(stmt.on_conflict_do_update(
+                    index_elements=["key"], set_={"value": stmt.excluded.value}
+                ))
+            db.session.execute(
+                sqlite_insert(Setting).values(key=self.VERSION_KEY, value="0").on_conflict_do_nothing(index_elements=["key"])
+            )
+            db.session.execute(
+                db.update(Setting)
+                .where(Setting.key == self.VERSION_KEY)
+                .values(value=db.cast(db.cast(Setting.value, db.Integer) + 1, db.String))
+            )
+            bump_data_version(db.session.connection())
+            version = self._db_version()
+            db.session.commit()
+
+            # someone else wrote in between: take the whole table again
+            if self._values is None or version != self._version + 1:
+                self._load()
+            else:
+                self._values.update(values)
+                self._version = version
+                self._checked_at = time.monotonic()
+
+# each household has its own SettingsStore (see HOUSEHOLDS)
 def get_setting(key, default=None):
-    s = Setting.query.filter_by(key=key).first()
-    return s.value if s else default
+    return current_household().settings.get(key, default)
+
+def set_settings(values):
+    current_household().settings.set_many(values)
 
 def set_setting(key, value):
-    s = Setting.query.filter_by(key=key).first()
-    if not s:
-        s = Setting(key=key, value=str(value))
-        db.session.add(s)
-    else:
-        s.value = str(value)
-    db.session.commit()
+    set_settings({key: value})
 
 def bool_setting(key, default=False):
     v = get_setting(key, None)
@@ -92,8 +721,7 @@ def bool_setting(key, default=False):
         return default
     return str(v).lower() in ("1", "true", "yes", "on")
 
-def get_monthly_income_value():
-    incomes = Income.query.all()
+def normalized_monthly_income(incomes):
     total = 0.0
     for i in incomes:
         if i.frequency == 'Bi-weekly':
@@ -104,11 +732,60 @@ def get_monthly_income_value():
             total += i.amount
     return total
 
-def weighted_apr(debts):
-    total_bal = sum(d.balance for d in debts) or 0.0
-    if total_bal <= 0:
-        return 0.0
-    return sum((d.balance / total_bal) * d.interest_rate for d in debts)
+def _portfolio_totals_select():
+    income, bill = raw_cents(Income.amount), raw_cents(Bill.amount)
+    monthly_amount = db.case(
+        (Income.frequency == "Bi-weekly", income * 26 / 12.0),
+        (Income.frequency == "Weekly", income * 52 / 12.0),
+        else_=income,
+    )
+    bill_monthly = db.case(
+        (Bill.frequency == "Weekly", bill * 52 / 12.0),
+        (Bill.frequency == "Bi-weekly", bill * 26 / 12.0),
+        (Bill.frequency == "Quarterly", bill / 3.0),
+        (Bill.frequency == "Yearly", bill / 12.0),
+        (Bill.frequency == "Once", 0.0),
+        else_=bill,
+    )
+    balance = raw_cents(Debt.balance)
+    return db.select(
+        db.select(func.coalesce(func.sum(monthly_amount), 0)).scalar_subquery().label("monthly_income"),
+        db.select(func.coalesce(func.sum(balance), 0)).scalar_subquery().label("total_debt"),
+        db.select(func.coalesce(func.sum(raw_cents(Debt.min_payment)), 0)).scalar_subquery().label("total_min_debt"),
+        db.select(func.coalesce(func.sum(balance * Debt.interest_rate), 0.0)).scalar_subquery().label("balance_apr"),
+        db.select(func.coalesce(func.sum(bill_monthly), 0)).scalar_subquery().label("total_bills"),
+    )
+
+# no per-call parameters, so build it once rather than on every dashboard hit
+PORTFOLIO_TOTALS = _portfolio_totals_select()
+
+def portfolio_totals():
+    """
+    Dashboard/payoff totals as SQL aggregates in one round trip
+    (one scalar subquery per table, no ORM rows). Sums run on cents.
+    """
+    row = db.session.execute(PORTFOLIO_TOTALS).one()
+
+    total_debt = row.total_debt / 100
+    return {
+        "monthly_income": row.monthly_income / 100,
+        "total_debt": total_debt,
+        "total_min_debt": row.total_min_debt / 100,
+        "total_bills": row.total_bills / 100,
+        "weighted_apr": row.balance_apr / row.total_debt if row.total_debt > 0 else 0.0,
+    }
+
+def leftover_cashflow(totals=None):
+    # income less bills and debt minimums: what the extra payment defaults to
+    totals = totals or portfolio_totals()
+    return totals["monthly_income"] - totals["total_bills"] - totals["total_min_debt"]
+
+def debt_rows():
+    # just the columns the sims, strategies, risk mode and charts read, as lightweight rows
+    return db.session.execute(
+        db.select(Debt.name, Debt.balance, Debt.interest_rate, Debt.min_payment, Debt.priority,
+                  Debt.promo_rate, Debt.promo_end, Debt.split_pct, Debt.variable_rate).order_by(Debt.id)
+    ).all()
 
 def month_bounds(year, month):
     first = date(year, month, 1)
@@ -131,45 +808,226 @@ def parse_month_param(month_str):
         today = date.today()
         return today.year, today.month
 
-def simulate_payoff(debts, extra_monthly=0.0, method="avalanche", max_months=600):
+def add_months(dt, months):
+    yy = dt.year + (dt.month - 1 + months) // 12
+    mm = (dt.month - 1 + months) % 12 + 1
+    dd = min(dt.day, calendar.monthrange(yy, mm)[1])
+    return date(yy, mm, dd)
+
+PAY_PERIOD_DAYS = {"Weekly": 7, "Bi-weekly": 14}
+
+def paychecks_between(anchor, frequency, start, end):
+    """
+    Number of pay dates in [start, end] for a schedule anchored at `anchor`
+    (anchor, anchor + 1 period, ...). Pay dates before the anchor don't count.
+    Closed form, so distant months cost the same as this one.
     """
-    Monthly compounding sim.
-    Uses min payments + extra (attack power).
+    first = max(start, anchor)
+    if first > end:
+        return 0
+
+    step = PAY_PERIOD_DAYS.get((frequency or "Monthly").strip())
+    if step:
+        k = -(-(first - anchor).days // step)  # ceil
+        first_pay = anchor + timedelta(days=k * step)
+        if first_pay > end:
+            return 0
+        return (end - first_pay).days // step + 1
+
+    # Monthly: one pay date per month on anchor.day, clamped to short months
+    k_lo = (first.year - anchor.year) * 12 + (first.month - anchor.month)
+    if add_months(anchor, k_lo) < first:
+        k_lo += 1
+    k_hi = (end.year - anchor.year) * 12 + (end.month - anchor.month)
+    if add_months(anchor, k_hi) > end:
+        k_hi -= 1
+    return max(k_hi - k_lo + 1, 0)
+
+def income_in_month(inc, month_start, month_end):
+    # If no next pay date, we can't do "exact paycheck count"
+    if not inc.next_pay_date:
+        # fallback: normalized monthly for this one income
+        if inc.frequency == "Bi-weekly":
+            return (inc.amount * 26) / 12
+        if inc.frequency == "Weekly":
+            return (inc.amount * 52) / 12
+        return inc.amount
+
+    return float(inc.amount) * paychecks_between(inc.next_pay_date, inc.frequency, month_start, month_end)
+
+# ---------- Recurring bills ----------
+
+BILL_FREQUENCIES = ["Monthly", "Weekly", "Bi-weekly", "Quarterly", "Yearly", "Once"]
+BILL_PERIOD_MONTHS = {"Monthly": 1, "Quarterly": 3, "Yearly": 12}
+
+def _parse_bill_frequency(val):
+    val = (val or "").strip().lower()
+    return next((f for f in BILL_FREQUENCIES if f.lower() == val), "Monthly")
+
+def bill_occurrences(anchor, frequency, start, end):
+    """
+    Due dates in [start, end] for a bill first due on `anchor`, generated lazily.
+    Jumps straight to the first occurrence in range, so far-off months are cheap.
+    """
+    if anchor is None or anchor > end:
+        return
+    if frequency == "Once":
+        if anchor >= start:
+            yield anchor
+        return
+
+    step = PAY_PERIOD_DAYS.get(frequency)
+    if step:
+        d = anchor + timedelta(days=max(-(-(start - anchor).days // step), 0) * step)
+        while d <= end:
+            yield d
+            d += timedelta(days=step)
+        return
+
+    # month-based: always offset from the anchor so a 31st doesn't drift to the 28th
+    period = BILL_PERIOD_MONTHS.get(frequency, 1)
+    k = max((start.year - anchor.year) * 12 + (start.month - anchor.month), 0)
+    k = -(-k // period) * period
+    while True:
+        d = add_months(anchor, k)
+        if d > end:
+            return
+        if d >= start:
+            yield d
+        k += period
+
+def recurring_bill_items(bills, month_start, month_end, scheduled_names=()):
+    """
+    Schedule entries for bills due this month. A bill already scheduled by hand
+    (a 'bill' planned payment with the same name that month) isn't added twice.
+    """
+    items = []
+    for b in bills:
+        if b.name in scheduled_names:
+            continue
+        for d in bill_occurrences(b.due_date, b.frequency, month_start, month_end):
+            items.append({"id": None, "pay_date": d, "name": b.name, "amount": float(b.amount),
+                          "kind": "bill", "recurring": True})
+    return items
+
+def month_cashflow(incomes, month_start, month_end, planned_total):
+    """
+    Income vs planned payments for one month (the Monthly Schedule summary).
+    Exact paycheck counts if any income has a next pay date, else normalized.
+    """
+    any_has_next = any(i.next_pay_date for i in incomes)
+    if any_has_next:
+        month_income = sum(income_in_month(i, month_start, month_end) for i in incomes)
+    else:
+        month_income = normalized_monthly_income(incomes)
+
+    remainder = month_income - planned_total
+    coverage_pct = (planned_total / month_income * 100.0) if month_income > 0 else 0.0
+    return {
+        "month_income": month_income,
+        "planned_total": planned_total,
+        "remainder": remainder,
+        "coverage_pct": coverage_pct,
+        "any_has_next": any_has_next
+    }
+
+# ---------- Integer cents ----------
+# The payoff engines run on int64 cents. APRs become integer units of
+# 1/10,000 of a percent, so a month's interest is an exact integer ratio,
+# rounded half to even. A debt is paid off when it reaches exactly 0.
+
+APR_SCALE = 10_000
+INTEREST_DIVISOR = 12 * 100 * APR_SCALE  # cents * APR units / this = a month's interest in cents
+INT64_MAX = int(np.iinfo(np.int64).max)
+
+def round_half_even_div(num, den):
+    """num / den rounded half to even; Python ints or int64 arrays, den > 0 and even."""
+    # round half up, then step exact ties that landed on an odd number back down
+    q, r = divmod(num + den // 2, den)
+    return q - ((r == 0) & (q & 1))
+
+# Below this bal * apr product the float64 quotient is within 2**-27 of the
+# true one while non-tie results sit >= 1/INTEREST_DIVISOR away from a half,
+# so np.rint (half to even) gives exactly the integer division's answer.
+FLOAT_EXACT_PRODUCT = 2 ** 26 * INTEREST_DIVISOR
+
+def monthly_interest(bal, apr_units, small=False):
+    """
+    A month of interest in cents on `bal` cents, banker's rounded.
+    small=True (caller checked bal * apr_units < FLOAT_EXACT_PRODUCT) takes
+    the cheaper float route to the same integers.
+    """
+    num = bal * apr_units
+    if small:
+        return np.rint(num / INTEREST_DIVISOR).astype(np.int64)
+    return round_half_even_div(num, INTEREST_DIVISOR)
+
+def _balance_limits(apr_units):
+    """
+    (limit, small): past `limit` the interest product would overflow int64, so
+    the portfolio is spiralling and counts as never paid off; up to `small`
+    monthly_interest can take its float route.
+    """
+    top = max(int(np.max(apr_units, initial=0)), 1)
+    return INT64_MAX // top, FLOAT_EXACT_PRODUCT // top
+
+def simulate_payoff_reference(debts, extra_monthly=0.0, method="avalanche", max_months=600):
+    """
+    Monthly compounding sim on integer cents (original per-debt loop).
+    Kept as the reference the vectorized simulate_payoff is checked against;
+    they agree exactly, month skipping or not.
     """
     if not debts:
         return 0, None, 0.0
 
+    bal, apr, mins = _debt_arrays(debts)
+    promo = _promo_arrays(debts)
+    plan = strategy_plan(method, debts, bal, apr, mins, promo)
     sim = [{
         "name": d.name,
-        "bal": float(d.balance),
-        "apr": float(d.interest_rate) / 100.0,
-        "min": float(d.min_payment)
-    } for d in debts]
-
-    def sort_key(x):
-        if method == "snowball":
-            return (x["bal"], -x["apr"])
-        return (-x["apr"], x["bal"])
+        "idx": i,
+        "bal": int(bal[i]),
+        "apr": int(apr[i]),
+        "min": int(mins[i]),
+        "promo_apr": int(promo[0][i]) if promo else 0,
+        "promo_months": int(promo[1][i]) if promo else 0,
+        "rank": int(plan.rank[i]) if plan.rank is not None else 0,
+        "weight": int(plan.weights[i]) if plan.weights is not None else 0,
+    } for i, d in enumerate(debts)]
+
+    def apr_in(d, month):
+        return d["promo_apr"] if month <= d["promo_months"] else d["apr"]
+
+    def sort_key(x, month):
+        a = apr_in(x, month)
+        if plan.mode == "balance":
+            return (x["bal"], -a, x["idx"])
+        if plan.mode == "cost":
+            return (-x["bal"] * a, -a, x["idx"])
+        if plan.mode == "apr":
+            return (-a, x["bal"], x["idx"])
+        return (x["rank"],)
 
     months = 0
-    total_interest = 0.0
+    total_interest = 0
     start = date.today()
+    extra_monthly = to_cents(max(extra_monthly, 0.0))
 
-    monthly_payment_floor = sum(d["min"] for d in sim) + max(extra_monthly, 0)
-    monthly_interest_floor = sum(d["bal"] * (d["apr"] / 12) for d in sim)
+    monthly_payment_floor = sum(d["min"] for d in sim) + extra_monthly
+    monthly_interest_floor = sum(monthly_interest(d["bal"], apr_in(d, 1)) for d in sim)
     if monthly_payment_floor <= monthly_interest_floor:
         return max_months, None, float("inf")
 
-    while any(d["bal"] > 0.01 for d in sim):
+    while any(d["bal"] > 0 for d in sim):
         months += 1
         if months > max_months:
-            return max_months, None, total_interest
+            return max_months, None, total_interest / 100
 
         # interest
         for d in sim:
             if d["bal"] <= 0:
                 continue
-            interest = d["bal"] * (d["apr"] / 12)
+            interest = monthly_interest(d["bal"], apr_in(d, months))
             total_interest += interest
             d["bal"] += interest
 
@@ -180,33 +1038,1618 @@ def simulate_payoff(debts, extra_monthly=0.0, method="avalanche", max_months=600
             pay = min(d["min"], d["bal"])
             d["bal"] -= pay
 
-        # extra
-        extra = max(extra_monthly, 0.0)
-        while extra > 0.01 and any(d["bal"] > 0.01 for d in sim):
-            sim.sort(key=sort_key)
-            target = next((x for x in sim if x["bal"] > 0.01), None)
-            if not target:
+        # extra: a split hands out its shares first, the rest goes down the order
+        extra = extra_monthly
+        if plan.mode == "split" and extra > 0:
+            live = [d for d in sim if d["bal"] > 0]
+            weight = sum(d["weight"] for d in live)
+            for d in (live if weight else ()):
+                pay = min(extra_monthly * d["weight"] // weight, d["bal"])
+                d["bal"] -= pay
+                extra -= pay
+        for target in sorted(sim, key=lambda x: sort_key(x, months)):
+            if extra <= 0:
                 break
+            if target["bal"] <= 0:
+                continue
             pay = min(extra, target["bal"])
             target["bal"] -= pay
             extra -= pay
 
     payoff_date = start + timedelta(days=int(months * 30.4375))
-    return months, payoff_date, total_interest
+    return months, payoff_date, total_interest / 100
+
+def _debt_arrays(debts):
+    """(balance cents, APR units, min payment cents) as int64 arrays."""
+    bal = units_array([d.balance for d in debts], 100)
+    apr = units_array([d.interest_rate for d in debts], APR_SCALE)
+    mins = units_array([d.min_payment for d in debts], 100)
+    return bal, apr, mins
+
+def _promo_arrays(debts, start=None):
+    """
+    (promo APR units, promo months) as int64 arrays, or None if no debt has a
+    promo running. Sim month t (1 = the coming month) charges the promo APR
+    while t <= promo months and interest_rate after that.
+    """
+    start = start or date.today()
+    promo_apr = np.zeros(len(debts), dtype=np.int64)
+    promo_months = np.zeros(len(debts), dtype=np.int64)
+    for i, d in enumerate(debts):
+        rate, end = getattr(d, "promo_rate", None), getattr(d, "promo_end", None)
+        if rate is None or end is None:
+            continue
+        # last month of the sim that still starts on or before promo_end
+        months = (end.year - start.year) * 12 + end.month - start.month
+        if add_months(start, months) > end:
+            months -= 1
+        if months > 0:
+            promo_apr[i] = to_units(rate, APR_SCALE)
+            promo_months[i] = months
+    return (promo_apr, promo_months) if promo_months.any() else None
+
+def _apr_in_month(apr, promo, month):
+    """APR units charged in sim month `month` (a scalar, or per row as a column vector)."""
+    if promo is None:
+        return apr
+    return np.where(month <= promo[1], promo[0], apr)
+
+# ---------- Strategies ----------
+# A strategy decides where the extra goes each month. Its plan() looks at the
+# portfolio once and returns a StrategyPlan the engines follow:
+#   "apr" / "balance" / "cost": cascade down an order ranked on the live APR,
+#       balance, or a month's interest (balance * APR), re-ranked as they move
+#   "rank": cascade down a fixed order worked out up front (`rank` is each
+#       debt's position in it)
+#   "split": share the extra by the integer `weights` across owing debts;
+#       rounding cents and shares bigger than a balance cascade down `rank`
+# Ties break by input order everywhere. Add one by subclassing Strategy and
+# decorating it with @register_strategy; every engine, the dashboard ranking
+# and the strategy pickers pick it up from STRATEGIES.
+
+PLAN_MODES = ("apr", "balance", "cost", "rank", "split")
+MODE_CODE = {m: i for i, m in enumerate(PLAN_MODES)}  # how the row engines carry a plan's mode
+StrategyPlan = namedtuple("StrategyPlan", "mode rank weights", defaults=(None, None))
+
+STRATEGIES = {}
+
+def register_strategy(cls):
+    STRATEGIES[cls.name] = cls()
+    return cls
+
+class Strategy:
+    """Base class; plan() gets the debt rows and their (cents / APR units) arrays."""
+    name = ""
+    label = ""
+    description = ""
+
+    def plan(self, debts, bal, apr, mins, promo):
+        raise NotImplementedError
+
+def strategy_plan(method, debts, bal, apr, mins, promo):
+    return STRATEGIES[method].plan(debts, bal, apr, mins, promo)
+
+def _plan_key(plan):
+    # hashable stand-in for a plan in cache keys
+    return (
+        plan.mode,
+        None if plan.rank is None else plan.rank.tobytes(),
+        None if plan.weights is None else plan.weights.tobytes(),
+    )
+
+def _rank_of(order):
+    rank = np.empty(order.size, dtype=np.int64)
+    rank[order] = np.arange(order.size)
+    return rank
+
+@register_strategy
+class Avalanche(Strategy):
+    name = "avalanche"
+    label = "Avalanche"
+    description = "Highest APR first"
+
+    def plan(self, debts, bal, apr, mins, promo):
+        return StrategyPlan("apr")
+
+@register_strategy
+class Snowball(Strategy):
+    name = "snowball"
+    label = "Snowball"
+    description = "Smallest balance first"
+
+    def plan(self, debts, bal, apr, mins, promo):
+        return StrategyPlan("balance")
+
+@register_strategy
+class InterestCost(Strategy):
+    name = "interest_cost"
+    label = "Interest Cost"
+    description = "Most interest per month first"
+
+    def plan(self, debts, bal, apr, mins, promo):
+        return StrategyPlan("cost")
+
+@register_strategy
+class CustomOrder(Strategy):
+    name = "custom"
+    label = "Custom Order"
+    description = "Your priority numbers, then highest APR"
+
+    def plan(self, debts, bal, apr, mins, promo):
+        # debts without a priority go after the numbered ones
+        prio = np.array([d.priority if getattr(d, "priority", None) is not None else INT64_MAX for d in debts],
+                        dtype=np.int64)
+        apr_now = _apr_in_month(apr, promo, 1)
+        order = np.lexsort((np.arange(bal.size), bal, -apr_now, prio))
+        return StrategyPlan("rank", _rank_of(order))
+
+@register_strategy
+class PromoAware(Strategy):
+    name = "promo_aware"
+    label = "Promo-Aware"
+    description = "Clears promo balances before the rate jumps"
+
+    def plan(self, debts, bal, apr, mins, promo):
+        # A promo debt the minimums won't clear before it ends ranks at the
+        # APR it's heading for (soonest expiry first); the rest by APR today.
+        effective = _apr_in_month(apr, promo, 1)
+        expiry = np.full(bal.size, INT64_MAX, dtype=np.int64)
+        if promo is not None:
+            promo_apr, promo_months = promo
+            clear = _months_to_clear(bal.astype(np.float64), promo_apr / INTEREST_DIVISOR, mins.astype(np.float64))
+            at_risk = (promo_months > 0) & (bal > 0) & (clear > promo_months)
+            effective = np.where(at_risk, np.maximum(apr, promo_apr), effective)
+            expiry = np.where(at_risk, promo_months, expiry)
+        order = np.lexsort((np.arange(bal.size), bal, expiry, -effective))
+        return StrategyPlan("rank", _rank_of(order))
+
+@register_strategy
+class Split(Strategy):
+    name = "split"
+    label = "Split"
+    description = "Extra shared by each debt's split %"
+
+    def plan(self, debts, bal, apr, mins, promo):
+        # basis points; no percentages at all means an even split
+        pct = [max(float(getattr(d, "split_pct", None) or 0.0), 0.0) for d in debts]
+        weights = units_array(pct, 100)
+        if not weights.any():
+            weights = np.ones(bal.size, dtype=np.int64)
+        # leftovers go highest APR first
+        order = np.lexsort((np.arange(bal.size), bal, -_apr_in_month(apr, promo, 1)))
+        return StrategyPlan("split", _rank_of(order), weights)
+
+app.jinja_env.globals["strategies"] = STRATEGIES  # the strategy pickers list whatever is registered
+
+def _priority_order(mode, bal, apr, rank, lanes, by_apr):
+    # same ordering as sort_key in simulate_payoff_reference, input order (`lanes`)
+    # as final tie-break. by_apr: the lanes are laid out by -apr then input
+    # order, so a stable sort on the first key settles the rest.
+    if by_apr:
+        if mode == "balance":
+            return np.argsort(bal, kind="stable")
+        if mode == "cost":
+            return np.argsort(-(bal * apr), kind="stable")
+        if mode == "apr":
+            return np.lexsort((bal, -apr))
+    elif mode == "balance":
+        return np.lexsort((lanes, -apr, bal))
+    elif mode == "cost":
+        return np.lexsort((lanes, -apr, -(bal * apr)))
+    elif mode == "apr":
+        return np.lexsort((lanes, bal, -apr))
+    return np.argsort(rank, kind="stable")
+
+def _split_shares(bal, weights, extra):
+    """Each owing debt's share of `extra` (rows x debts or one row), capped at its balance."""
+    w = np.where(bal > 0, weights, 0)
+    total = w.sum(axis=-1, keepdims=True)
+    return np.minimum(np.asarray(extra)[..., None] * w // np.maximum(total, 1), bal)
+
+# ---------- Month-skipping fast path ----------
+# Between payoff events every debt pays a fixed amount each month (its min,
+# plus its split share or the extra if it's the target), so those months
+# need neither the order nor the cascade. The engines work out a run of them
+# in one go (_ledger_path) and step only the months where something clears
+# or the order shifts. The run is the same ledger, every month's interest
+# banker's rounded on the balance before it, so the results match stepping
+# every month exactly. With no extra at all nothing ever cascades, so each
+# debt just runs on its own (_minimum_runs). MONTH_SKIPPING = False steps
+# every month.
+
+MONTH_SKIPPING = True
+JUMP_MIN = 6              # shortest run worth jumping
+JUMP_CELLS = 1 << 17      # cap on rows x months x debts worked out per jump
+SCALAR_LANES = 8          # portfolios this narrow jump in plain ints
+SCALAR_ROWS = 4           # ... when only this many rows are jumping; more go batched
+JUMP_MAX_WAIT = 16        # back-off cap (months) after attempts that found nothing to skip
+
+def _months_to_clear(bal, rate, pay):
+    """First month whose payment leaves a cent or less (inf if it never comes); bal/pay in cents."""
+    with np.errstate(divide="ignore", invalid="ignore"):
+        level = pay / rate
+        compounded = np.log((level - 1) / (level - bal)) / np.log1p(rate)
+        flat = (bal - 1) / pay
+    t = np.where(rate > 0, np.where(level > bal, compounded, np.inf), np.where(pay > 0, flat, np.inf))
+    return np.ceil(t)
+
+def _ledger_path(bal, apr, pay, k, limit, small, until_clear=False):
+    """
+    Balances after each of the next k months (k x rows x debts, int64) for
+    `bal` (rows x debts) paying a fixed `pay` with nothing clearing, charged
+    `apr` (per debt or rows x debts) and rounded every month exactly as the
+    stepped loop does. With nothing to rank or cascade a month is a handful
+    of in-place ops on float64 (whole cents, exact while the balances stay
+    under `small`), then on int64 past that. Returns (path, done): fewer
+    than k months are done if a balance outgrows `limit` (the engines step
+    those months themselves) or, with until_clear, once some balance clears.
+    """
+    # until_clear runs are usually short: grow the buffer as they go
+    path = np.empty((min(k, 32) if until_clear else k,) + bal.shape, dtype=np.int64)
+    b = bal.astype(np.float64)
+    a = apr.astype(np.float64)
+    p = pay.astype(np.float64)
+    interest = np.empty_like(b)
+    # bounds on the largest and smallest balance, so most months skip the max() / min()
+    growth = 1 + float(a.max(initial=0)) / INTEREST_DIVISOR
+    bound = float(b.max(initial=0))
+    drop = float(p.max(initial=0))  # interest is never negative, so no balance falls faster
+    low = float(b.min(initial=0)) if until_clear else np.inf
+    t = 0
+    while t < k:
+        if low <= 0:
+            low = float(b.min())
+            if low <= 0:
+                break
+        if bound > small:
+            bound = float(b.max())
+            if bound > small:
+                break
+        np.multiply(b, a, out=interest)
+        interest /= INTEREST_DIVISOR
+        np.rint(interest, out=interest)
+        b += interest
+        b -= p
+        if t == len(path):
+            path = np.concatenate((path, path))[:k]
+        path[t] = b
+        bound = bound * growth + 1
+        low -= drop
+        t += 1
+    if t < k and low > 0:
+        # spiralling: carry on with the exact integer division
+        b = path[t - 1].copy() if t else bal.copy()
+        while t < k and b.max() <= limit:
+            if until_clear and b.min() <= 0:
+                break
+            b += monthly_interest(b, apr)
+            b -= pay
+            if t == len(path):
+                path = np.concatenate((path, path))[:k]
+            path[t] = b
+            t += 1
+    return path, t
+
+def _lane_run(b, a, p, k, limit):
+    """
+    Up to k month-end balances (plain ints) of one debt paying a fixed `p`
+    cents at `a` APR units, rounded exactly as monthly_interest does. Ends
+    with the first balance at or below 0, or comes up short (last balance
+    still owing) where the next month would start above `limit`.
+    """
+    top = min(limit, (FLOAT_EXACT_PRODUCT - 1) // a) if a > 0 else limit  # float route up to here
+    run = []
+    for _ in range(k):
+        if b <= top:
+            b += round(b * a / INTEREST_DIVISOR) - p  # round() is half to even too
+        elif b <= limit:
+            b += round_half_even_div(b * a, INTEREST_DIVISOR) - p
+        else:
+            break
+        run.append(b)
+        if b <= 0:
+            break
+    return run
+
+def _ledger_lanes(bal, apr, pay, k, limit, small):
+    """
+    _ledger_path for one portfolio (1-D arrays), cut short before the first
+    month any debt clears or outgrows `limit`: returns months x debts.
+    A few debts are quicker as plain ints, lane after lane (each one shortens
+    the run for the rest); more go through _ledger_path together.
+    """
+    if bal.size > SCALAR_LANES:
+        path, done = _ledger_path(bal[None], apr, pay[None], k, limit, small, until_clear=True)
+        path = path[:done, 0]
+        live = (path > 0).all(axis=1)
+        return path if live.all() else path[:live.argmin()]
+    # lanes that can clear soonest go first, so their runs cut the others short
+    with np.errstate(divide="ignore"):
+        first = np.argsort(bal / pay, kind="stable")
+    cols = [None] * bal.size
+    for i, b, a, p in zip(first.tolist(), bal[first].tolist(), apr[first].tolist(), pay[first].tolist()):
+        col = _lane_run(b, a, p, k, limit)
+        if col and col[-1] <= 0:
+            col.pop()
+        k = len(col)
+        cols[i] = col
+    return np.array([col[:k] for col in cols], dtype=np.int64).reshape(len(cols), k).T
+
+def _minimum_runs(bal, apr, apr_after, promo_months, mins, max_months, limit):
+    """
+    Each debt paying just its minimum, on its own: with no extra nothing
+    cascades, so the debts never touch each other. Returns a list of runs
+    (the month-end balances as ints until the debt clears, the last one
+    then <= 0 by the overshoot, or max_months pass), or None if a balance
+    outgrows `limit`. `apr` is the coming month's, apr_after what follows
+    the promo months.
+    """
+    runs = []
+    for b, a, after, until, p in zip(bal.tolist(), apr.tolist(), apr_after.tolist(),
+                                     promo_months.tolist(), mins.tolist()):
+        run = []
+        for a, last in ((a, min(until, max_months)), (after, max_months)):
+            months = max(last - len(run), 0)
+            steps = _lane_run(b, a, p, months, limit)
+            if len(steps) < months and not (steps and steps[-1] <= 0):
+                return None
+            run += steps
+            b = run[-1] if run else b
+            if b <= 0:
+                break
+        runs.append(run)
+    return runs
+
+def _order_holds(path, bal, apr, target, boost, mode):
+    """
+    Months each row's `target` stays first in the priority order along `path`
+    (from _ledger_path). apr is per debt or rows x debts; target/boost/mode
+    are per row, mode a MODE_CODE (apr, balance or cost).
+    """
+    rows = np.arange(path.shape[0])
+    # the order is taken after mins, i.e. before the target gets its extra
+    t_bal = (path[rows, :, target] + boost[:, None])[:, :, None]
+    apr = np.broadcast_to(apr, bal.shape)
+    t_apr = apr[rows, target][:, None, None]
+    apr = apr[:, None, :]
+    codes = set(mode.tolist())
+    beats = np.empty(path.shape, dtype=bool)
+    for code in codes:
+        # only the rows on this mode (all of them, usually)
+        r = mode == code if len(codes) > 1 else slice(None)
+        # ties count as a reorder, to stay on the safe side (and the float
+        # interest comparison leans that way too)
+        if code == MODE_CODE["balance"]:
+            beats[r] = path[r] <= t_bal[r]
+        elif code == MODE_CODE["cost"]:
+            beats[r] = path[r] * apr[r].astype(np.float64) >= t_bal[r] * t_apr[r].astype(np.float64) * (1 - 1e-12)
+        else:
+            beats[r] = (apr[r] > t_apr[r]) | ((apr[r] == t_apr[r]) & (path[r] <= t_bal[r]))
+    beats &= (bal > 0)[:, None, :]
+    beats[rows, :, target] = False
+
+    reordered = beats.any(axis=2)
+    return np.where(reordered.any(axis=1), reordered.argmax(axis=1), path.shape[1])
+
+def _jump_pay(bal, mins, extra, weights=None):
+    """
+    What each debt pays every month of a jump (bal is debts or rows x debts):
+    its minimum plus, with `weights`, its split share. Returns (pay, boost),
+    boost being what's left of the extra for the first debt in the order.
+    """
+    owing = bal > 0
+    pay = np.where(owing, mins, 0)
+    boost = np.maximum(extra, 0)
+    if weights is not None:
+        # nothing clears inside a jump, so split shares are fixed across it
+        w = np.where(owing, weights, 0)
+        shares = np.expand_dims(boost, -1) * w // np.maximum(w.sum(axis=-1, keepdims=True), 1)
+        pay += shares
+        boost = boost - shares.sum(axis=-1)
+    return pay, boost
+
+def _jump_viable(bal, pay):
+    """
+    Whether a jump is worth working out (per row for rows x debts): interest
+    only slows a payoff down, so a debt within JUMP_MIN payments of clearing
+    can't get far; those are left to the stepped loop.
+    """
+    return ((bal > JUMP_MIN * pay) | (bal <= 0)).all(axis=-1)
+
+def _jump_rows(bal, apr, mins, extra, mode, target, weights, check, room, limit, small):
+    """
+    Fast path for the engines; bal is rows x debts. apr is what the coming
+    month charges (per debt, or rows x debts under a promo), `target` each
+    row's first owing debt in its priority order right now, `check` the rows
+    whose order can shift under a jump, `room` how far each row may go.
+    Returns (k, balances, interest): each row jumps k months (0 if it can't).
+    When only a few rows jump, those down to a few owing debts work out their
+    run alone (_ledger_lanes); everything else goes together.
+    """
+    owing = bal > 0
+    pay, boost = _jump_pay(bal, mins, extra, weights)
+    pay[np.arange(bal.shape[0]), target] += boost
+    viable = _jump_viable(bal, pay) & owing.any(axis=1)
+    k = np.zeros(bal.shape[0], dtype=np.int64)
+    if not viable.any():
+        return k, bal, k
+    lanes = owing.sum(axis=1)
+    window = np.where(viable, np.minimum(room, max(JUMP_CELLS // bal.size, JUMP_MIN)), 0)
+    # narrow rows' ledgers stop short of the next payoff by themselves; the
+    # batched one runs to the predicted first payoff and says where it really is
+    narrow = viable & (lanes <= SCALAR_LANES)
+    if np.count_nonzero(narrow) > SCALAR_ROWS:
+        narrow[:] = False
+    wide = viable & ~narrow
+    if wide.any():
+        horizon = np.where(owing, _months_to_clear(bal, apr / INTEREST_DIVISOR, pay), np.inf).min(axis=1)
+        window = np.where(wide, np.minimum(window, horizon), window)
+    window = np.where(window >= JUMP_MIN, window, 0).astype(np.int64)
+    if not window.any():
+        return k, bal, k
+    # the order only matters while there's extra to aim
+    check = check & (boost > 0) & (lanes > 1)
+    apr = np.broadcast_to(apr, bal.shape)
+    jumped = bal.copy()
+
+    narrow &= window > 0
+    for r in np.flatnonzero(narrow).tolist():
+        c = np.flatnonzero(owing[r])
+        path = _ledger_lanes(bal[r, c], apr[r, c], pay[r, c], int(window[r]), limit, small)
+        months = path.shape[0]
+        if months >= JUMP_MIN and check[r]:
+            months = min(months, int(_order_holds(path[None], bal[r, c][None], apr[r, c],
+                                                  c.searchsorted(target[r:r + 1]), boost[r:r + 1], mode[r:r + 1])[0]))
+        if months >= JUMP_MIN:
+            k[r] = months
+            jumped[r, c] = path[months - 1]
+
+    wide = np.flatnonzero((window > 0) & ~narrow)
+    if wide.size:
+        path, done = _ledger_path(bal[wide], apr[wide], pay[wide], int(window[wide].max()), limit, small)
+        if done >= JUMP_MIN:
+            path = path[:done].transpose(1, 0, 2)  # rows x months x debts
+            # stop short of any debt clearing ...
+            live = ((path > 0) | ~owing[wide, None, :]).all(axis=2)
+            months = np.minimum(window[wide], np.where(live.all(axis=1), done, live.argmin(axis=1)))
+            # ... and of the order shifting
+            c = np.flatnonzero(check[wide] & (months > 0))
+            if c.size:
+                months[c] = np.minimum(months[c], _order_holds(path[c], bal[wide[c]], apr[wide[c]],
+                                                               target[wide[c]], boost[wide[c]], mode[wide[c]]))
+            hit = np.flatnonzero(months >= JUMP_MIN)
+            k[wide[hit]] = months[hit]
+            jumped[wide[hit]] = path[hit, months[hit] - 1]
+
+    interest = (jumped - bal).sum(axis=1) + k * pay.sum(axis=1)
+    return k, jumped, interest
+
+def _sim_inputs(debts, method):
+    """(bal, apr, mins, promo, plan): what the engines take for `debts` under strategy `method`."""
+    bal, apr, mins = _debt_arrays(debts)
+    promo = _promo_arrays(debts)
+    return bal, apr, mins, promo, strategy_plan(method, debts, bal, apr, mins, promo)
+
+@timed_phase("sim")
+def simulate_payoff(debts, extra_monthly=0.0, method="avalanche", max_months=600):
+    """
+    Monthly compounding sim, vectorized over debts.
+    Same rules as simulate_payoff_reference; results are memoized in sim_cache.
+    """
+    if not debts:
+        return 0, None, 0.0
+
+    bal, apr, mins, promo, plan = _sim_inputs(debts, method)
+    extra_monthly = to_cents(max(extra_monthly, 0.0))
+    key = (_portfolio_fingerprint(bal, apr, mins, promo), date.today(), extra_monthly, _plan_key(plan), max_months)
+    result = sim_cache.get(key)
+    if result is None:
+        result = _simulate_payoff(bal, apr, mins, extra_monthly, plan, max_months, promo=promo)
+        sim_cache.put(key, result)
+    return result
+
+def _simulate_payoff(bal, apr, mins, extra_monthly, plan, max_months, timeline=None, paid_month=None, promo=None):
+    """
+    Interest and mins are array ops; extra (attack power) goes out as the
+    StrategyPlan says: split shares first, then a cascade down a priority
+    order that is only rebuilt when it can actually change.
+    Works in cents / APR units (see _debt_arrays); returns interest in dollars.
+    If `timeline` ((max_months + 1) x n) and `paid_month` (n, -1 = owing) are
+    given, each month's balances (dollars) and each debt's payoff month land in them.
+    """
+    # `apr` is what the coming month charges; a promo's end swaps in apr_after
+    apr_after = apr
+    promo_months = np.zeros(apr.size, dtype=np.int64)
+    switches = []  # sim months after which some promo rate ends
+    if promo is not None:
+        promo_months = promo[1]
+        apr = _apr_in_month(apr, promo, 1)
+        switches = sorted(set(promo_months[promo_months > 0].tolist()))
+    limit, small = _balance_limits(np.maximum(apr, apr_after))
+
+    months = 0
+    total_interest = 0
+    start = date.today()
+
+    if bal.size and bal.max() > limit:
+        return max_months, None, float("inf")
+    monthly_payment_floor = int(mins.sum()) + extra_monthly
+    monthly_interest_floor = int(monthly_interest(bal, apr).sum())
+    if monthly_payment_floor <= monthly_interest_floor:
+        return max_months, None, float("inf")
+
+    mode = plan.mode
+    split = mode == "split"
+    rank = plan.rank if plan.rank is not None else np.zeros(bal.size, dtype=np.int64)
+    weights = plan.weights if plan.weights is not None else np.zeros(bal.size, dtype=np.int64)
+
+    def reranks(apr):
+        # Paid-off debts are dropped from the arrays, so every lane left is owing.
+        # Avalanche with distinct APRs and the fixed orders then never reorder;
+        # snowball, interest cost (and APR ties) rank on live balances each month.
+        return mode in ("balance", "cost") or (mode == "apr" and np.unique(apr).size != apr.size)
+
+    rerank = reranks(apr)
+    # Without promos the APRs never change, so the lanes are laid out by -apr
+    # then input order (like the row engine's columns) and the rankings need one key.
+    by_apr = promo is None
+    lanes = np.lexsort((np.arange(bal.size), -apr)) if by_apr else np.arange(bal.size)
+    lanes = lanes[bal[lanes] > 0]  # original column of each remaining lane
+    # every per-lane input in one block, so a payoff drops its lane in one go
+    block = np.stack((apr, apr_after, promo_months, mins, rank, weights, np.arange(bal.size)))[:, lanes]
+    bal = bal[lanes]
+    apr, apr_after, promo_months, mins, rank, weights, lanes = block
+    order = _priority_order(mode, bal, apr, rank, lanes, by_apr).tolist()
+    accrued = 0
+    jumpable = MONTH_SKIPPING and bool((apr >= 0).all() and (apr_after >= 0).all() and (mins >= 0).all())
+    next_jump, jump_wait = 0, 1
+    # upper bound on the largest balance, so most months skip the max() for the limit checks
+    growth = 1 + float(np.max(np.maximum(apr, apr_after), initial=0)) / INTEREST_DIVISOR
+    bound = float(np.max(bal, initial=0))
+
+    if jumpable and extra_monthly <= 0 and max_months > 0:
+        # minimums only: nothing cascades, so every debt runs on its own
+        runs = _minimum_runs(bal, apr, apr_after, promo_months, mins, max_months, limit)
+        if runs is None:
+            return max_months, None, float("inf")
+        # a run's last balance overshoots zero by the part of that minimum it didn't need
+        total_interest = sum(run[-1] - b + len(run) * p for run, b, p in zip(runs, bal.tolist(), mins.tolist()))
+        cleared = [run[-1] <= 0 for run in runs]
+        if timeline is not None:
+            for lane, run, done in zip(lanes.tolist(), runs, cleared):
+                timeline[1:len(run) + 1, lane] = np.maximum(run, 0) / 100
+                if done:
+                    paid_month[lane] = len(run)
+        if not all(cleared):
+            return max_months, None, total_interest / 100
+        months = max(map(len, runs), default=0)
+        return months, start + timedelta(days=int(months * 30.4375)), total_interest / 100
+
+    while bal.size:
+        # fast path: nothing clears for a while -> jump over those months
+        if jumpable and months >= next_jump and max_months - months >= JUMP_MIN:
+            target = int(_priority_order(mode, bal, apr, rank, lanes, by_apr)[0]) if rerank else order[0]
+            pay, boost = _jump_pay(bal, mins, extra_monthly, weights if split else None)
+            pay[target] += boost
+            room = max_months - months
+            if switches:
+                room = min(room, switches[0] - months)  # don't jump past a promo ending
+            k = 0
+            if _jump_viable(bal, pay):
+                # the ledger stops short of the next payoff by itself
+                path = _ledger_lanes(bal, apr, pay, min(room, JUMP_CELLS // bal.size), limit, small)
+                k = path.shape[0]
+                # the order only matters while there's extra to aim
+                if k >= JUMP_MIN and rerank and boost > 0 and bal.size > 1:
+                    k = min(k, int(_order_holds(path[None], bal[None], apr, np.array([target]),
+                                                np.array([boost]), np.array([MODE_CODE[mode]]))[0]))
+            if k >= JUMP_MIN:
+                if timeline is not None:
+                    timeline[months + 1:months + k + 1, lanes] = path[:k] / 100
+                total_interest += int(path[k - 1].sum() - bal.sum()) + k * int(pay.sum())
+                bal = path[k - 1].copy()
+                bound = float(bal.max())
+                months += k
+                jump_wait = 1
+            else:
+                # payoffs are close together here; don't pay for the check every month
+                jump_wait = min(jump_wait * 2, JUMP_MAX_WAIT)
+            next_jump = months + jump_wait
+
+        months += 1
+        if months > max_months:
+            return max_months, None, (total_interest + int(np.sum(accrued))) / 100
+        if switches and months > switches[0]:
+            # a promo rate ended last month: those debts charge their regular APR from here
+            while switches and months > switches[0]:
+                switches.pop(0)
+            block[0] = np.where(promo_months >= months, apr, apr_after)
+            rerank = reranks(apr)
+            order = _priority_order(mode, bal, apr, rank, lanes, by_apr).tolist()
+        if bound > small:
+            bound = float(bal[bal.argmax()])
+            if bound > limit:
+                return max_months, None, float("inf")
+
+        # interest
+        interest = monthly_interest(bal, apr, bound <= small)
+        accrued = accrued + interest
+        bal += interest
+        bound = bound * growth + 1
+
+        # mins
+        bal -= np.minimum(mins, bal)
+
+        # extra
+        extra = extra_monthly
+        if extra > 0:
+            if split:
+                shares = _split_shares(bal, weights, extra)
+                bal -= shares
+                extra -= int(shares.sum())
+            if rerank:
+                order = _priority_order(mode, bal, apr, rank, lanes, by_apr).tolist()
+            for i in order:
+                if extra <= 0:
+                    break
+                owed = int(bal[i])
+                if owed <= 0:
+                    continue
+                pay = min(extra, owed)
+                bal[i] = owed - pay
+                extra -= pay
+
+        low = bal[bal.argmin()]  # argmin skips the reduction machinery min() goes through
+        if timeline is not None:
+            timeline[months, lanes] = bal / 100
+            if low <= 0:
+                cleared = (bal <= 0) & (paid_month[lanes] < 0)
+                paid_month[lanes[cleared]] = months
+
+        if low <= 0:
+            total_interest += int(accrued.sum())
+            accrued = 0
+            owing = bal > 0
+            bal, block = bal[owing], block[:, owing]
+            apr, apr_after, promo_months, mins, rank, weights, lanes = block
+            if not rerank:
+                order = _priority_order(mode, bal, apr, rank, lanes, by_apr).tolist()
+
+    total_interest += int(np.sum(accrued))
+    payoff_date = start + timedelta(days=int(months * 30.4375))
+    return months, payoff_date, total_interest / 100
+
+@timed_phase("sim")
+def simulate_payoff_timeline(debts, extra_monthly=0.0, method="avalanche", max_months=600):
+    """
+    simulate_payoff plus the month-by-month balance of every debt.
+    Returns (months, payoff_date, total_interest, balances, payoff_months):
+    balances is float32 dollars, (months + 1) x n_debts with row 0 = today, and
+    payoff_months[i] is the month debt i was cleared (-1 = never).
+    Not cached; the matrix is the point.
+    """
+    if not debts:
+        return 0, None, 0.0, np.zeros((1, 0), dtype=np.float32), np.zeros(0, dtype=np.int32)
+
+    bal, apr, mins, promo, plan = _sim_inputs(debts, method)
+    timeline = np.zeros((max_months + 1, bal.size), dtype=np.float32)
+    timeline[0] = bal / 100
+    paid_month = np.where(bal <= 0, 0, -1).astype(np.int32)
+
+    months, payoff_date, total_interest = _simulate_payoff(
+        bal, apr, mins, to_cents(max(extra_monthly, 0.0)), plan, max_months, timeline, paid_month, promo
+    )
+    rows = 1 if total_interest == float("inf") else months + 1
+    return months, payoff_date, total_interest, timeline[:rows].copy(), paid_month
+
+@timed_phase("sim")
+def simulate_payoff_many(debts, extras, methods=("avalanche", "snowball"), max_months=600):
+    """
+    Batch version of simulate_payoff for what-if tables and strategy rankings.
+    Scenarios not already in sim_cache run together through _simulate_payoff_rows.
+    Returns {method: [(months, payoff_date, total_interest) per extra]}.
+    """
+    extras = np.maximum(units_array(list(extras), 100), 0).tolist()
+    methods = list(methods)
+    if not debts:
+        return {m: [(0, None, 0.0)] * len(extras) for m in methods}
+
+    bal, apr, mins = _debt_arrays(debts)
+    promo = _promo_arrays(debts)
+    plans = {m: strategy_plan(m, debts, bal, apr, mins, promo) for m in methods}
+    fingerprint = _portfolio_fingerprint(bal, apr, mins, promo)
+    today = date.today()
+
+    out = {m: [None] * len(extras) for m in methods}
+    pending = []
+    for m in methods:
+        for k, x in enumerate(extras):
+            hit = sim_cache.get((fingerprint, today, x, _plan_key(plans[m]), max_months))
+            if hit is None:
+                pending.append((m, k))
+            else:
+                out[m][k] = hit
+
+    if pending:
+        results = _simulate_payoff_rows(
+            bal, apr, mins,
+            np.array([extras[k] for _, k in pending], dtype=np.int64),
+            [plans[m] for m, _ in pending],
+            max_months,
+            promo,
+        )
+        for (m, k), result in zip(pending, results):
+            sim_cache.put((fingerprint, today, extras[k], _plan_key(plans[m]), max_months), result)
+            out[m][k] = result
+    return out
+
+def _simulate_payoff_rows(bal0, apr, mins, row_extra, row_plans, max_months, promo=None):
+    """
+    One row of a 2-D balance matrix per scenario; all rows are stepped
+    together and drop out as they pay off. Returns a result tuple per row.
+    Cents / APR units in, interest in dollars out (like _simulate_payoff);
+    row_plans has each row's StrategyPlan, promo is from _promo_arrays.
+    """
+    # Columns are laid out in avalanche order (-apr, then input order), so a
+    # row's first stop for its extra is its first owing column on one key
+    # (plain_key). APR ties add a balance tie-break; promo rates need the full keys.
+    n = bal0.size
+    cols = np.lexsort((np.arange(n), -apr))
+    bal0, apr, mins = bal0[cols], apr[cols], mins[cols]
+    if promo is not None:
+        promo = (promo[0][cols], promo[1][cols])
+    limit, small = _balance_limits(apr if promo is None else np.maximum(apr, promo[0]))
+    _, group, group_size = np.unique(apr, return_inverse=True, return_counts=True)
+    shared = group_size[group] > 1  # columns whose APR another column has too
+    plain = promo is None and not shared.any()
+    start = date.today()
+    results = [None] * row_extra.size
+
+    mode = np.array([MODE_CODE[p.mode] for p in row_plans], dtype=np.int64)
+    rank = weights = None
+    if (mode >= MODE_CODE["rank"]).any():
+        rank = np.stack([np.zeros(n, dtype=np.int64) if p.rank is None else p.rank[cols] for p in row_plans])
+    if (mode == MODE_CODE["split"]).any():
+        weights = np.stack([np.zeros(n, dtype=np.int64) if p.weights is None else p.weights[cols] for p in row_plans])
+
+    monthly_payment_floor = int(mins.sum()) + row_extra
+    first_apr = _apr_in_month(apr, promo, 1)
+    monthly_interest_floor = int(monthly_interest(bal0, first_apr).sum()) if bal0.max() <= limit else INT64_MAX
+    for r in np.flatnonzero(monthly_payment_floor <= monthly_interest_floor).tolist():
+        results[r] = (max_months, None, float("inf"))
+
+    rows = np.flatnonzero(monthly_payment_floor > monthly_interest_floor)
+    # a negative balance never changes (nothing pays it or charges on it), so it's just 0 here
+    bal = np.tile(np.maximum(bal0, 0), (rows.size, 1))
+    extra = row_extra[rows]
+    mode = mode[rows]
+    if rank is not None:
+        rank = rank[rows]
+    if weights is not None:
+        weights = weights[rows]
+    total_interest = np.zeros(rows.size, dtype=np.int64)
+    months = np.zeros(rows.size, dtype=np.int64)  # rows skip ahead independently
+    jumpable = MONTH_SKIPPING and bool((apr >= 0).all() and (mins >= 0).all()
+                                       and (promo is None or (promo[0] >= 0).all()))
+    step, next_jump, jump_wait = 0, 0, 1
+
+    by_balance = (mode == MODE_CODE["balance"])[:, None]
+    costly = bool((mode == MODE_CODE["cost"]).any())
+
+    def plain_key(bal, apr_now):
+        # without promos a row's first stop is its first owing column on this key
+        # (avalanche rows: 0, i.e. the top APR)
+        m = mode[:, None]
+        key = bal * by_balance
+        if rank is not None:
+            key = np.where(m >= MODE_CODE["rank"], rank, key)
+        if costly:
+            key = np.where(m == MODE_CODE["cost"], -(bal * apr_now), key)
+        return key
+
+    def priority(bal, apr_now):
+        # each row's full priority order (rows x columns), for when promo rates move the APRs
+        m = mode[:, None]
+        primary = np.where(m == MODE_CODE["apr"], -apr_now, bal if rank is None else rank)
+        if rank is not None:
+            primary = np.where(m == MODE_CODE["balance"], bal, primary)
+        if (mode == MODE_CODE["cost"]).any():
+            primary = np.where(m == MODE_CODE["cost"], -(bal * apr_now), primary)
+        secondary = np.where(m == MODE_CODE["apr"], bal, np.where(m < MODE_CODE["rank"], -apr_now, 0))
+        secondary = np.broadcast_to(secondary, bal.shape)
+        return np.lexsort((np.broadcast_to(cols, bal.shape), secondary, primary), axis=-1)
+
+    def first_owing(bal, apr_now, order=None):
+        # each row's first owing column in its priority order (where its extra goes first)
+        owing = bal > 0
+        if promo is not None:
+            if order is None:
+                order = priority(bal, apr_now)
+            return order[np.arange(bal.shape[0]), np.take_along_axis(owing, order, axis=1).argmax(axis=1)]
+        first = np.where(owing, plain_key(bal, apr_now), INT64_MAX).argmin(axis=1)
+        if not plain:
+            # APR ties: avalanche rows take the smallest balance at the top APR
+            fix = np.flatnonzero((mode == MODE_CODE["apr"]) & shared[first])
+            if fix.size:
+                tied = owing[fix] & (apr == apr[first[fix]][:, None])
+                first[fix] = np.where(tied, bal[fix], INT64_MAX).argmin(axis=1)
+        return first
+
+    def apr_in(month):
+        return apr if promo is None else np.where(month[:, None] <= promo[1], promo[0], apr)
+
+    def keep_rows(keep):
+        nonlocal rows, bal, extra, mode, by_balance, rank, weights, total_interest, months
+        rows, bal, extra, mode, by_balance, total_interest, months = (
+            rows[keep], bal[keep], extra[keep], mode[keep], by_balance[keep], total_interest[keep], months[keep]
+        )
+        if rank is not None:
+            rank = rank[keep]
+        if weights is not None:
+            weights = weights[keep]
+
+    idle = extra <= 0
+    if jumpable and idle.any():
+        # minimums only: no strategy has anything to aim, and the single
+        # engine runs each debt on its own; one run covers all these rows
+        result = _simulate_payoff(bal0, apr, mins, 0, StrategyPlan("apr"), max_months, promo=promo)
+        for r in rows[idle].tolist():
+            results[r] = result
+        keep_rows(~idle)
+
+    while rows.size:
+        done = ~(bal > 0).any(axis=1)
+        if done.any():
+            for r, m, tot in zip(rows[done].tolist(), months[done].tolist(), total_interest[done].tolist()):
+                results[r] = (m, start + timedelta(days=int(m * 30.4375)), tot / 100)
+            keep_rows(~done)
+            if not rows.size:
+                break
+
+        step += 1
+        if jumpable and step >= next_jump:
+            apr_next = apr_in(months + 1)
+            room = max_months - months
+            if promo is not None:
+                # no jumping past the last month of a promo rate
+                ahead = promo[1][None, :] - months[:, None]
+                room = np.minimum(room, np.where(ahead >= 1, ahead, INT64_MAX).min(axis=1))
+            # rows whose order can shift as the balances move
+            check = (mode == MODE_CODE["balance"]) | (mode == MODE_CODE["cost"])
+            if not plain:
+                check |= mode == MODE_CODE["apr"]
+            k, bal, jumped_interest = _jump_rows(bal, apr_next, mins, extra, mode, first_owing(bal, apr_next),
+                                                 weights, check, room, limit, small)
+            total_interest += jumped_interest
+            months += k
+            # the batch steps until its slowest row is done: a jump only saves steps if every row took one
+            jump_wait = 1 if k.min() >= JUMP_MIN else min(jump_wait * 2, JUMP_MAX_WAIT)
+            next_jump = step + jump_wait
+
+        months += 1
+        over = months > max_months
+        top = bal.max()
+        if top > limit:
+            # spiralling past what int64 can charge interest on: never paid off
+            blown = (bal > limit).any(axis=1)
+            for r in rows[blown & ~over].tolist():
+                results[r] = (max_months, None, float("inf"))
+            over |= blown
+        if over.any():
+            for r, tot in zip(rows[over].tolist(), total_interest[over].tolist()):
+                if results[r] is None:
+                    results[r] = (max_months, None, tot / 100)
+            keep_rows(~over)
+            if not rows.size:
+                break
+
+        # interest
+        apr_now = apr_in(months)
+        interest = monthly_interest(bal, apr_now, top <= small)
+        total_interest += interest.sum(axis=1)
+        bal += interest
+
+        # mins
+        bal -= np.where(bal > 0, np.minimum(mins, bal), 0)
+
+        # extra: split shares, then down each row's priority order a stop at a
+        # time; in most months every row's first stop takes all of it
+        if not (extra > 0).any():
+            continue
+        left = extra
+        if weights is not None:
+            shares = _split_shares(bal, weights, extra)
+            bal -= shares
+            left = extra - shares.sum(axis=1)
+        order = None if promo is None else priority(bal, apr_now)
+        # stops are picked through a flat view: much cheaper than (row, column) fancy indexing
+        bal = np.ascontiguousarray(bal)
+        flat, row_start = bal.reshape(-1), np.arange(0, bal.size, n)
+        while True:
+            # paying a debt off only drops it from the order, so the rest stays put
+            at = row_start + first_owing(bal, apr_now, order)
+            owed = flat[at]
+            pay = np.minimum(left, owed)
+            flat[at] = owed - pay
+            left = left - pay
+            if not np.minimum(left, pay).any():
+                break
+
+    return results
+
+def _top_rate(d):
+    # highest APR % the debt can charge, promo or not
+    return max(float(d.interest_rate), float(getattr(d, "promo_rate", None) or 0.0))
+
+@timed_phase("sim")
+def solve_extra_for_target(debts, target_months, method="avalanche"):
+    """
+    Smallest extra_monthly (to the cent) that clears every debt within
+    target_months. Payoff months only go down as extra goes up, so this
+    bisects on cents; each probe stops at target_months instead of running
+    to 600, and probes are memoized (here and in sim_cache).
+    Returns (extra, (months, payoff_date, total_interest), probes).
+    """
+    if not debts or target_months < 1:
+        return 0.0, simulate_payoff(debts, 0.0, method, max(target_months, 1)), 0
+
+    probes = {}
+
+    def run(cents):
+        if cents not in probes:
+            probes[cents] = simulate_payoff(debts, cents / 100.0, method, target_months)
+        return probes[cents]
+
+    def hits_target(cents):
+        months, payoff_date, _ = run(cents)
+        return payoff_date is not None and months <= target_months
+
+    if hits_target(0):
+        return 0.0, run(0), len(probes)
+
+    # Upper bound: enough extra to clear everything (after a month of interest) in month one.
+    hi = int(math.ceil(sum(float(d.balance) * (1 + _top_rate(d) / 1200.0) for d in debts) * 100)) + 1
+    lo = 0
+    # Cheap lower bound: extra + mins must at least cover the balance spread over the horizon.
+    floor = int(sum(float(d.balance) for d in debts) / target_months * 100) - int(sum(float(d.min_payment) for d in debts) * 100)
+    if 0 < floor < hi and not hits_target(floor):
+        lo = floor
+
+    while hi - lo > 1:
+        mid = (lo + hi) // 2
+        if hits_target(mid):
+            hi = mid
+        else:
+            lo = mid
+
+    return hi / 100.0, run(hi), len(probes)
+
+# ---------------- RISK (MONTE CARLO) ----------------
+# Stochastic version of the payoff sim: thousands of paths stepped together,
+# one row per path (same cascade as _simulate_payoff_rows). Per path and month:
+#   * an index rate that moves with probability rate_move_prob by N(0, rate_vol)
+#     percentage points, added to every variable-rate debt's APR
+#   * each paycheck due that month (from the Income schedules) is missed with
+#     probability miss_prob, otherwise cut by cut_frac with probability cut_prob;
+#     the lost pay comes out of that month's extra (minimums are always paid)
+# Same integer cents / APR units and strategy plans as simulate_payoff; a
+# drifted APR is rounded to whole APR units. With no shocks the results match
+# simulate_payoff exactly (APR ties break by starting balance).
+
+RISK_DEFAULT_PATHS = 2000
+RISK_MAX_PATHS = 20000
+RISK_CHUNK_PATHS = 2500  # paths per chunk, each with its own spawned seed; bounds the path arrays
+RISK_HORIZON = 360
+
+def paycheck_schedule(incomes, months, start=None):
+    """(amounts[I] in cents, counts[months, I]) of paychecks due in each month from `start`'s month on."""
+    first = (start or date.today()).replace(day=1)
+    amounts = units_array([inc.amount for inc in incomes], 100)
+    counts = np.zeros((months, len(incomes)), dtype=np.int64)
+    for k in range(months):
+        m = add_months(first, k)
+        m_start, m_end = month_bounds(m.year, m.month)
+        for i, inc in enumerate(incomes):
+            # unanchored schedules get paid from the start of the window
+            counts[k, i] = paychecks_between(inc.next_pay_date or first, inc.frequency, m_start, m_end)
+    return amounts, counts
+
+def simulate_payoff_paths(bal0, apr, mins, variable, base_extra, pay_amounts, pay_counts, plan,
+                          n_paths, max_months, rate_vol=0.0, rate_move_prob=0.0,
+                          miss_prob=0.0, cut_prob=0.0, cut_frac=0.5, seed=None, promo=None):
+    """
+    Cents / APR units in (see _debt_arrays; base_extra and pay_amounts in cents),
+    `plan` a StrategyPlan and `promo` from _promo_arrays.
+    Returns (months[n_paths], interest[n_paths] in dollars); months is
+    max_months + 1 for paths still in debt at the horizon (interest inf if
+    the balance spiralled past what int64 can hold).
+    """
+    rng = np.random.default_rng(seed)
+    base_apr = _apr_in_month(apr, promo, 1)  # this month's APRs before any index drift
+    # column order is the tie-break: starting balance for avalanche, input order for the rest
+    tiebreak = bal0 if plan.mode == "apr" else np.zeros_like(bal0)
+    cols = np.lexsort((np.arange(bal0.size), tiebreak, -base_apr))
+    bal0, apr, base_apr, mins, variable = (
+        np.maximum(bal0[cols], 0), apr[cols], base_apr[cols], mins[cols], variable[cols]
+    )
+    switches = set()  # months after which some promo rate ends
+    if promo is not None:
+        promo_apr, promo_months = promo[0][cols], promo[1][cols]
+        switches = set(promo_months[promo_months > 0].tolist())
+    mode = plan.mode
+    weights = plan.weights[cols] if mode == "split" else None
+    has_variable = bool(variable.any()) and rate_vol > 0 and rate_move_prob > 0
+    has_shocks = pay_amounts.size > 0 and (miss_prob > 0 or cut_prob > 0)
+
+    out_months = np.full(n_paths, max_months + 1, dtype=np.int64)
+    out_interest = np.zeros(n_paths)
+
+    rows = np.arange(n_paths)
+    bal = np.tile(bal0, (n_paths, 1))
+    total_interest = np.zeros(n_paths, dtype=np.int64)
+    index_shift = np.zeros(n_paths)  # APR units added to variable-rate debts
+    path_apr = base_apr  # broadcasts until the index moves
+    if has_variable:
+        path_apr = np.tile(base_apr, (n_paths, 1))
+    limit, small = _balance_limits(path_apr)
+    # per-path priority; fixed for rank / split plans, else it starts in column order
+    if mode in ("rank", "split"):
+        order = np.tile(np.argsort(plan.rank[cols], kind="stable"), (n_paths, 1))
+    else:
+        order = np.tile(np.arange(apr.size), (n_paths, 1))
+    miss_cut = miss_prob + (1 - miss_prob) * cut_prob
+
+    for month in range(1, max_months + 1):
+        if month - 1 in switches:
+            # a promo rate ended last month: every path moves to the regular APR
+            base_apr = np.where(month <= promo_months, promo_apr, apr)
+            path_apr = base_apr
+            if has_variable:
+                path_apr = np.maximum(base_apr + np.rint(index_shift[:, None]).astype(np.int64) * variable, 0)
+            limit, small = _balance_limits(path_apr)
+            if mode == "apr":
+                order = np.argsort(-np.broadcast_to(path_apr, bal.shape), axis=1, kind="stable")
+
+        # interest; only paths whose index moved get new rates (and avalanche order)
+        if has_variable:
+            moved = np.flatnonzero(rng.random(rows.size) < rate_move_prob)
+            if moved.size:
+                index_shift[moved] += rng.normal(0.0, rate_vol * APR_SCALE, moved.size)
+                moved_apr = np.maximum(base_apr + np.rint(index_shift[moved, None]).astype(np.int64) * variable, 0)
+                path_apr[moved] = moved_apr
+                limit, small = _balance_limits(path_apr)
+                if mode == "apr":
+                    # columns are already in tie-break order, so a stable sort on APR is enough
+                    order[moved] = np.argsort(-moved_apr, axis=1, kind="stable")
+        top = bal.max()
+        if top > limit:
+            # spiralling past what int64 can charge interest on: never paid off
+            blown = (bal > limit).any(axis=1)
+            out_interest[rows[blown]] = np.inf
+            keep = ~blown
+            rows, bal, total_interest, index_shift, order = (
+                rows[keep], bal[keep], total_interest[keep], index_shift[keep], order[keep]
+            )
+            if np.ndim(path_apr) == 2:
+                path_apr = path_apr[keep]
+            if not rows.size:
+                break
+        interest = monthly_interest(bal, path_apr, top <= small)
+        total_interest += interest.sum(axis=1)
+        bal += interest
+
+        # mins
+        bal -= np.where(bal > 0, np.minimum(mins, bal), 0)
+
+        # extra, less this month's missed / cut paychecks (one uniform draw per paycheck)
+        extra = np.full(rows.size, base_extra, dtype=np.int64)
+        if has_shocks:
+            checks = np.repeat(pay_amounts, pay_counts[month - 1])
+            if checks.size:
+                u = rng.random((rows.size, checks.size))
+                lost = np.where(u < miss_prob, 1.0, np.where(u < miss_cut, cut_frac, 0.0)) @ checks
+                extra = np.maximum(extra - np.rint(lost).astype(np.int64), 0)
+
+        if (extra > 0).any():
+            if weights is not None:
+                shares = _split_shares(bal, weights, extra)
+                bal -= shares
+                extra = extra - shares.sum(axis=1)
+            if mode in ("balance", "cost"):
+                # the order rarely changes month to month: re-sort only the rows that broke it
+                # (paid-off debts sort last so the live ones lead)
+                key = np.where(bal > 0, bal if mode == "balance" else -(bal * path_apr), np.inf)
+                ranked_key = np.take_along_axis(key, order, axis=1)
+                stale = np.flatnonzero((ranked_key[:, 1:] < ranked_key[:, :-1]).any(axis=1))
+                if stale.size and promo is None:
+                    order[stale] = np.argsort(key[stale], axis=1, kind="stable")
+                elif stale.size:
+                    # a promo ending reshuffles the APRs, so column order can't settle ties any more
+                    ties = np.broadcast_to(-path_apr, bal.shape)[stale]
+                    order[stale] = np.lexsort((np.broadcast_to(cols, ties.shape), ties, key[stale]), axis=-1)
+            _cascade_extra(bal, order, extra)
+
+        done = ~(bal > 0).any(axis=1)
+        if done.any():
+            out_months[rows[done]] = month
+            out_interest[rows[done]] = total_interest[done] / 100
+            keep = ~done
+            rows, bal, total_interest, index_shift, order = (
+                rows[keep], bal[keep], total_interest[keep], index_shift[keep], order[keep]
+            )
+            if np.ndim(path_apr) == 2:
+                path_apr = path_apr[keep]
+            if not rows.size:
+                break
+
+    out_interest[rows] = total_interest / 100
+    return out_months, out_interest
+
+def _cascade_extra(bal, order, extra):
+    """Pay `extra` down each row's priority order, in place."""
+    # Extra rarely reaches past the first couple of debts in line, so gather
+    # and scatter only the leading k columns of the order, widening k until
+    # every row's extra is used up within them.
+    k = min(2, bal.shape[1])
+    while True:
+        lead = order[:, :k]
+        ranked = np.take_along_axis(bal, lead, axis=1)
+        if k == bal.shape[1] or (ranked.sum(axis=1) >= extra).all():
+            break
+        k = min(k * 2, bal.shape[1])
+    # balances are never negative here, so what's owed is just the balance
+    before = np.zeros_like(ranked)
+    np.cumsum(ranked[:, :-1], axis=1, out=before[:, 1:])
+    left = extra[:, None] - before
+    pay = np.where(left > 0, np.minimum(left, ranked), 0)
+    np.put_along_axis(bal, lead, ranked - pay, axis=1)
+
+def _risk_chunk(args):
+    return simulate_payoff_paths(*args[:-1], **args[-1])
+
+@timed_phase("sim")
+def simulate_payoff_risk(debts, incomes, extra_monthly, method="avalanche", n_paths=RISK_DEFAULT_PATHS,
+                         max_months=RISK_HORIZON, target_months=None, seed=0, **shocks):
+    """
+    Monte Carlo payoff: P10/P50/P90 payoff months and the share of paths
+    debt-free within target_months. `shocks` go to simulate_payoff_paths.
+    debts: rows as from debt_rows().
+    """
+    n_paths = min(max(int(n_paths), 1), RISK_MAX_PATHS)
+    if not debts:
+        return {"paths": n_paths, "p10": 0, "p50": 0, "p90": 0, "prob_by_target": 1.0 if target_months else None,
+                "prob_within_horizon": 1.0, "interest_p50": 0.0, "horizon": max_months}
+
+    bal, apr, mins, promo, plan = _sim_inputs(debts, method)
+    variable = np.array([bool(d.variable_rate) for d in debts])
+    pay_amounts, pay_counts = paycheck_schedule(incomes, max_months)
+
+    sizes = [RISK_CHUNK_PATHS] * (n_paths // RISK_CHUNK_PATHS)
+    if n_paths % RISK_CHUNK_PATHS:
+        sizes.append(n_paths % RISK_CHUNK_PATHS)
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    jobs = [(bal, apr, mins, variable, to_cents(max(float(extra_monthly), 0.0)), pay_amounts, pay_counts, plan,
+             size, max_months, {**shocks, "seed": sq, "promo": promo}) for size, sq in zip(sizes, seeds)]
+
+    # inline: this runs on the request path, where the process pool never goes
+    parts = [_risk_chunk(job) for job in jobs]
+    months = np.concatenate([p[0] for p in parts])
+    interest = np.concatenate([p[1] for p in parts])
+
+    def pct(q):
+        # months past the horizon -> None ("not within the horizon")
+        v = int(np.percentile(months, q, method="higher"))
+        return v if v <= max_months else None
+
+    cleared = months <= max_months
+    return {
+        "paths": n_paths,
+        "horizon": max_months,
+        "p10": pct(10),
+        "p50": pct(50),
+        "p90": pct(90),
+        "prob_within_horizon": float(cleared.mean()),
+        "prob_by_target": float((months <= target_months).mean()) if target_months else None,
+        "interest_p50": float(np.median(interest[cleared])) if cleared.any() else None,
+    }
+
+# ---------------- SIM CACHE ----------------
+
+class LRUCache:
+    """
+    Bounded, thread-safe LRU with hit/miss counters.
+    Used for payoff results (sim_cache), schedule fragments, dropdown options
+    and open household engines. `on_evict(value)` runs for each entry pushed out.
+    """
+
+    def __init__(self, maxsize=1024, on_evict=None):
+        self.maxsize = maxsize
+        self.on_evict = on_evict
+        self.hits = 0
+        self.misses = 0
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            result = self._data.get(key)
+            if result is None:
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return result
+
+    def put(self, key, result):
+        evicted = []
+        with self._lock:
+            self._data[key] = result
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                evicted.append(self._data.popitem(last=False)[1])
+        # outside the lock: eviction hooks may be slow (closing connections)
+        if self.on_evict is not None:
+            for value in evicted:
+                self.on_evict(value)
+
+    def pop(self, key):
+        # drop one entry without running on_evict; the caller cleans it up
+        with self._lock:
+            return self._data.pop(key, None)
+
+    def values(self):
+        with self._lock:
+            return list(self._data.values())
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def stats(self):
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "size": len(self._data), "maxsize": self.maxsize}
+
+# key: (portfolio fingerprint, start date, extra, strategy plan, max_months)
+sim_cache = LRUCache()
+
+def _portfolio_fingerprint(bal, apr, mins, promo=None):
+    # (balance, interest_rate, min_payment[, promo APR, promo months]) per debt, in input order (order breaks ties)
+    return hashlib.blake2b(np.stack([bal, apr, mins, *(promo or ())]).tobytes(), digest_size=16).hexdigest()
+
+_SIM_INPUT_MODELS = (Debt, Income, Bill)
+
+@event.listens_for(db.session, "after_flush")
+def _note_sim_input_writes(session, flush_context):
+    # new/dirty/deleted still hold the pre-flush state here
+    if any(isinstance(o, _SIM_INPUT_MODELS) for o in chain(session.new, session.dirty, session.deleted)):
+        session.info["sim_inputs_changed"] = True
+
+@event.listens_for(db.session, "after_commit")
+def _refresh_projections(session):
+    # sim_cache is keyed by the portfolio's content, so it needs no clearing here
+    # (and one household's edit shouldn't flush everyone else's runs)
+    if session.info.pop("sim_inputs_changed", False):
+        projection_worker.submit(current_household().name, None)  # refresh every stored projection
+
+@event.listens_for(db.session, "after_rollback")
+def _forget_sim_input_writes(session):
+    session.info.pop("sim_inputs_changed", None)
+
+# ---------------- HOUSEHOLDS ----------------
+# Every household is its own SQLite file. "default" is the original strategy.db,
+# so a single-family install keeps working as before; the rest live in
+# HOUSEHOLDS_DIR/<name>.db. Each request picks its household from the
+# X-Household header (only with TRUST_HOUSEHOLD_HEADER=1, i.e. behind a reverse
+# proxy that authenticates users and sets it) or, failing that, the one chosen
+# on the settings page, and db.session sends every statement to that
+# household's engine. A browser only gets into households it created or joined
+# with the household's access code, the default one included (its first code is
+# written to access_code.txt in the data dir); until then every page sends it
+# to /household. Engines sit in an LRU so one process can
+# serve hundreds of households; evicting one (too many open, or idle for
+# HOUSEHOLD_IDLE_SECONDS) closes its pooled connections.
+
+DEFAULT_HOUSEHOLD = "default"
+HOUSEHOLD_HEADER = "X-Household"
+HOUSEHOLD_NAME = re.compile(r"[a-z0-9][a-z0-9_-]{0,39}")
+TRUST_HOUSEHOLD_HEADER = os.environ.get("TRUST_HOUSEHOLD_HEADER", "").lower() in ("1", "true", "yes", "on")
+ACCESS_CODE_KEY = "household_access_code"  # Setting row holding the code's hash
+
+class Household:
+    """An open household: its engine and its in-process settings copy."""
+
+    def __init__(self, name, engine):
+        self.name = name
+        self.engine = engine
+        self.settings = SettingsStore()
+
+class HouseholdRegistry:
+    """
+    Opens household databases on first use (creating/migrating the schema once
+    per process) and keeps up to `max_open` of them around, least recently used
+    out first. Households nobody touched for `idle_seconds` are closed too
+    (0 keeps them until pushed out). The default household is always open and
+    never evicted.
+    """
+
+    def __init__(self, root, max_open=64, idle_seconds=900):
+        self.root = root
+        self.idle_seconds = idle_seconds
+        self.engines = LRUCache(maxsize=max_open, on_evict=self._close)
+        self._default = None
+        self._migrated = set()
+        self._last_used = {}  # name -> time.monotonic() of the last get/create
+        self._swept_at = time.monotonic()
+        self._lock = threading.Lock()
+
+    @property
+    def default(self):
+        if self._default is None:
+            self._default = Household(DEFAULT_HOUSEHOLD, db.engine)
+        return self._default
+
+    def path(self, name):
+        return os.path.join(self.root, f"{name}.db")
+
+    def exists(self, name):
+        return name == DEFAULT_HOUSEHOLD or os.path.exists(self.path(name))
+
+    def get(self, name):
+        """The household called `name`, opened if need be; None if it doesn't exist."""
+        if name == DEFAULT_HOUSEHOLD:
+            return self.default
+        self._sweep_idle()
+        household = self.engines.get(name)
+        if household is None:
+            with self._lock:
+                household = self.engines.get(name)
+                if household is None and os.path.exists(self.path(name)):
+                    household = self._open(name)
+        if household is not None:
+            self._last_used[name] = time.monotonic()
+        return household
+
+    def create(self, name):
+        """Create and open a new household; None if `name` is already taken."""
+        if self.exists(name):
+            return None
+        with self._lock:
+            if os.path.exists(self.path(name)):
+                return None
+            os.makedirs(self.root, exist_ok=True)
+            household = self._open(name)
+        self._last_used[name] = time.monotonic()
+        return household
+
+    def _open(self, name):
+        engine = db.create_engine(f"sqlite:///{self.path(name)}", **app.config["SQLALCHEMY_ENGINE_OPTIONS"])
+        if name not in self._migrated:
+            init_schema(engine)
+            self._migrated.add(name)
+        household = Household(name, engine)
+        self.engines.put(name, household)
+        return household
+
+    def _close(self, household):
+        self._last_used.pop(household.name, None)
+        # connections still checked out finish their request and are closed on return
+        household.engine.dispose()
+
+    def _sweep_idle(self):
+        # at most a few times per idle period, so the hot path is one clock read
+        now = time.monotonic()
+        if not self.idle_seconds or now - self._swept_at < min(self.idle_seconds / 4, 60):
+            return
+        self._swept_at = now
+        idle = []
+        with self._lock:
+            for name, used in list(self._last_used.items()):
+                if now - used > self.idle_seconds:
+                    household = self.engines.pop(name)
+                    if household is not None:
+                        idle.append(household)
+                    self._last_used.pop(name, None)
+        for household in idle:
+            self._close(household)
+
+    def dispose(self, close=True):
+        for household in self.engines.values():
+            household.engine.dispose(close=close)
+
+households = HouseholdRegistry(
+    os.environ.get("HOUSEHOLDS_DIR") or os.path.join(os.path.dirname(db_path), "households"),
+    max_open=int(os.environ.get("HOUSEHOLD_ENGINES", 64)),
+    idle_seconds=float(os.environ.get("HOUSEHOLD_IDLE_SECONDS", 900)),
+)
+
+def current_household():
+    # set per request by _select_household; startup and background jobs get the default unless they set g.household
+    household = g.get("household")
+    if household is None:
+        if has_request_context():
+            abort(403)  # this browser hasn't joined a household; _select_household lets only the join pages through
+        return households.default
+    return household
+
+def new_access_code(household):
+    """Issue (or replace) the household's access code; only its hash is stored."""
+    code = secrets.token_urlsafe(9)
+    stmt = sqlite_insert(Setting).values(key=ACCESS_CODE_KEY, value=generate_password_hash(code))
+    with household.engine.begin() as conn:
+        conn.execute(stmt.on_conflict_do_update(index_elements=["key"], set_={"value": stmt.excluded.value}))
+    return code
+
+def first_access_code(household):
+    """Give a household that has no access code its first one; None if it already has one."""
+    code = secrets.token_urlsafe(9)
+    stmt = sqlite_insert(Setting).values(key=ACCESS_CODE_KEY, value=generate_password_hash(code))
+    with household.engine.begin() as conn:
+        inserted = conn.execute(stmt.on_conflict_do_nothing(index_elements=["key"])).rowcount
+    return code if inserted else None
+
+def check_access_code(household, code):
+    with household.engine.connect() as conn:
+        stored = conn.execute(db.select(Setting.value).filter_by(key=ACCESS_CODE_KEY)).scalar()
+    return bool(stored and code) and check_password_hash(stored, code)
+
+# A fresh (or pre-access-code) install: the default household gets a code too,
+# written next to the database for whoever runs the server.
+ACCESS_CODE_FILE = os.path.join(os.path.dirname(db_path), "access_code.txt")
+with app.app_context():
+    _code = first_access_code(households.default)
+if _code is not None:
+    fd = os.open(ACCESS_CODE_FILE, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+    with os.fdopen(fd, "w") as fh:
+        fh.write(f"Access code for household '{DEFAULT_HOUSEHOLD}': {_code}\n")
+    app.logger.warning("access code for household '%s' written to %s", DEFAULT_HOUSEHOLD, ACCESS_CODE_FILE)
+del _code
+
+def session_households():
+    """Households this browser created or joined with an access code."""
+    return list(session.get("households", []))
+
+def _admit(name):
+    if name not in session_households():
+        session["households"] = session_households() + [name]
+
+def _header_household():
+    return request.headers.get(HOUSEHOLD_HEADER) if TRUST_HOUSEHOLD_HEADER else None
+
+# endpoints a browser that hasn't joined any household may still reach
+UNGATED_ENDPOINTS = ("static", "metrics", "join_household", "switch_household")
+
+@app.before_request
+def _select_household():
+    if request.endpoint in ("static", "metrics"):
+        return
+    pinned = _header_household()
+    if pinned:
+        # the proxy authenticated the user and picked the household; the session has no say
+        name = pinned.strip().lower()
+        household = households.get(name) if HOUSEHOLD_NAME.fullmatch(name) else None
+        if household is None:
+            abort(404)
+        g.household = household
+        return
+
+    known = session_households()
+    name = session.get("household")
+    if name not in known:
+        name = known[0] if known else None
+    household = households.get(name) if name else None
+    if household is None and name:
+        # the household picked in this browser is gone
+        session["households"] = [n for n in known if n != name]
+        session.pop("household", None)
+    g.household = household
+    if household is None and request.endpoint not in UNGATED_ENDPOINTS:
+        if request.path.startswith("/api/"):
+            abort(401)
+        return redirect(url_for("join_household"))
+
+@app.context_processor
+def _household_context():
+    household = g.get("household") if has_request_context() else None
+    pinned = has_request_context() and bool(_header_household())
+    return {"household": household.name if household else None, "household_pinned": pinned}
+
+@app.route("/household")
+def join_household():
+    """Landing page for a browser that hasn't joined a household yet."""
+    if g.get("household") is not None:
+        return redirect(url_for("settings"))
+    return render_template("household.html")
+
+@app.route("/household", methods=["POST"])
+def switch_household():
+    """Switch this browser to a household it knows, join one with its access code, or create a new one."""
+    back = url_for("settings") if g.get("household") else url_for("join_household")
+    if _header_household():
+        flash("This server is pinned to one household per user.", "danger")
+        return redirect(back)
+
+    action = request.form.get("action")
+    if action == "new_code":
+        if g.get("household") is not None:
+            code = new_access_code(g.household)
+            flash(f"New access code for '{g.household.name}': {code} (the old one no longer works).", "success")
+        return redirect(back)
+
+    name = (request.form.get("name") or "").strip().lower()
+    if not HOUSEHOLD_NAME.fullmatch(name):
+        flash("Household names are 1-40 lowercase letters, digits, '-' or '_'.", "danger")
+        return redirect(back)
+
+    if action == "create":
+        household = households.create(name)
+        if household is None:
+            flash(f"The name '{name}' is taken. To join that household, ask for its access code.", "danger")
+            return redirect(back)
+        code = new_access_code(household)
+        flash(f"Household '{name}' is ready. Its access code is {code}; share it with whoever should join. "
+              "It won't be shown again.", "success")
+    elif name not in session_households():
+        # same message either way, so the form can't be used to probe which households exist
+        household = households.get(name)
+        if household is None or not check_access_code(household, (request.form.get("code") or "").strip()):
+            flash("Unknown household or wrong access code.", "danger")
+            return redirect(back)
+
+    _admit(name)
+    session["household"] = name
+    # strategy overrides belong to the household they were set in
+    session.pop("strategy_method", None)
+    session.pop("extra_override", None)
+    return redirect(url_for("dashboard"))
+
+# ---------------- DATA VERSION ----------------
+# One counter for "anything changed", shared by every worker through the DB.
+# ORM writes bump it from after_flush; core writes (settings, bulk import) call bump_data_version.
+
+def bump_data_version(conn):
+    stmt = sqlite_insert(DataVersion).values(id=1, version=1)
+    conn.execute(stmt.on_conflict_do_update(
+        index_elements=[DataVersion.id], set_={"version": DataVersion.version + 1}
+    ))
+
+def data_version():
+    return db.session.execute(db.select(DataVersion.version).filter_by(id=1)).scalar() or 0
+
+@event.listens_for(db.session, "after_flush")
+def _bump_data_version_on_flush(session, flush_context):
+    if session.new or session.deleted or any(session.is_modified(o) for o in session.dirty):
+        bump_data_version(session.connection())
 
 # ---------------- DASHBOARD ----------------
 
-@app.route("/")
-def dashboard():
-    debts = Debt.query.all()
-    bills = Bill.query.all()
+def current_strategy(cashflow):
+    """(method, extra_monthly) from the strategy controls; extra defaults to leftover cashflow."""
+    method = session.get("strategy_method", get_setting("default_strategy", "avalanche") or "avalanche")
+    if method not in STRATEGIES:
+        method = "avalanche"
+    extra_override = session.get("extra_override", None)
+    extra_monthly = max(cashflow, 0.0) if extra_override is None else max(float(extra_override), 0.0)
+    return method, extra_monthly
+
+def requested_strategy():
+    """(method, extra_monthly) for the payoff APIs: current_strategy unless ?method= / ?extra= say otherwise."""
+    method, extra_monthly = current_strategy(leftover_cashflow())
+    method = (request.args.get("method") or method).strip().lower()
+    if method not in STRATEGIES:
+        method = "avalanche"
+    return method, max(_to_float(request.args.get("extra"), extra_monthly), 0.0)
+
+def dashboard_data():
+    """(summary, debt_chart) for the dashboard page and /api/summary."""
+    totals = portfolio_totals()
+    debts = debt_rows()
 
-    monthly_income = get_monthly_income_value()
-    total_debt = sum(d.balance for d in debts)
-    total_min_debt = sum(d.min_payment for d in debts)
-    total_bills = sum(b.amount for b in bills)
+    monthly_income = totals["monthly_income"]
+    total_debt = totals["total_debt"]
+    total_min_debt = totals["total_min_debt"]
+    total_bills = totals["total_bills"]
     obligations = total_bills + total_min_debt
-    cashflow = monthly_income - obligations
+    cashflow = leftover_cashflow(totals)
 
     # DTI: you asked about bills being included.
     # We'll show BOTH:
@@ -215,15 +2658,24 @@ def dashboard():
     cashflow_burden_pct = (obligations / monthly_income * 100) if monthly_income > 0 else 0.0
     lender_dti_pct = (total_min_debt / monthly_income * 100) if monthly_income > 0 else 0.0
 
-    w_apr = weighted_apr(debts)
+    w_apr = totals["weighted_apr"]
 
     # Strategy controls
-    method = session.get("strategy_method", get_setting("default_strategy", "avalanche") or "avalanche")
-    extra_override = session.get("extra_override", None)
-    extra_monthly = max(cashflow, 0.0) if extra_override is None else max(float(extra_override), 0.0)
-
-    ava_m, ava_date, ava_int = simulate_payoff(debts, extra_monthly, "avalanche")
-    snb_m, snb_date, snb_int = simulate_payoff(debts, extra_monthly, "snowball")
+    method, extra_monthly = current_strategy(cashflow)
+
+    # every registered strategy in one batched run, ranked best first
+    runs = simulate_payoff_many(debts, [extra_monthly], STRATEGIES)
+    ava_m, ava_date, ava_int = runs["avalanche"][0]
+    snb_m, snb_date, snb_int = runs["snowball"][0]
+    ranking = sorted(
+        ({"name": name, "label": strat.label, "description": strat.description,
+          "months": runs[name][0][0], "date": runs[name][0][1], "interest": runs[name][0][2],
+          "unreachable": runs[name][0][2] == float("inf")}
+         for name, strat in STRATEGIES.items()),
+        key=lambda r: (r["date"] is None, r["months"], r["interest"]),
+    )
+    for i, r in enumerate(ranking, 1):
+        r["rank"] = i
 
     summary = {
         "monthly_income": monthly_income,
@@ -241,6 +2693,7 @@ def dashboard():
         "snb": {"months": snb_m, "date": snb_date, "interest": snb_int},
         "ava_unreachable": (ava_int == float("inf")),
         "snb_unreachable": (snb_int == float("inf")),
+        "strategies": ranking,
     }
 
     # chart payload: debt balances + mins
@@ -250,13 +2703,17 @@ def dashboard():
         "apr": float(d.interest_rate),
         "min": float(d.min_payment),
     } for d in debts]
+    return summary, debt_chart
 
+@app.route("/")
+def dashboard():
+    summary, debt_chart = dashboard_data()
     return render_template("dashboard.html", summary=summary, debt_chart=debt_chart)
 
 @app.route("/strategy", methods=["POST"])
 def set_strategy_route():
     method = (request.form.get("method") or "avalanche").strip().lower()
-    if method not in ("avalanche", "snowball"):
+    if method not in STRATEGIES:
         method = "avalanche"
     session["strategy_method"] = method
 
@@ -304,7 +2761,14 @@ def manage_debt():
             flash("Debt requires name, balance, APR, and minimum payment.", "danger")
             return redirect(url_for("manage_debt"))
 
-        db.session.add(Debt(name=name, balance=float(balance), interest_rate=float(apr), min_payment=float(min_pay)))
+        variable_rate = request.form.get("variable_rate") == "on"
+        # optional strategy inputs; blanks stay unset
+        db.session.add(Debt(name=name, balance=float(balance), interest_rate=float(apr), min_payment=float(min_pay),
+                            variable_rate=variable_rate,
+                            priority=_parse_int(request.form.get("priority")),
+                            promo_rate=_to_float(request.form.get("promo_rate"), None),
+                            promo_end=_parse_date(request.form.get("promo_end")),
+                            split_pct=_to_float(request.form.get("split_pct"), None)))
         db.session.commit()
         flash("Debt added.", "success")
         return redirect(url_for("manage_debt"))
@@ -320,135 +2784,100 @@ def manage_bills():
         name = (request.form.get("name") or "").strip()
         amount = _to_float(request.form.get("amount"), None)
         due_date = _parse_date(request.form.get("due_date"))
+        frequency = _parse_bill_frequency(request.form.get("frequency"))
 
         if not name or amount is None or due_date is None:
             flash("Bill requires name, amount, and due date.", "danger")
             return redirect(url_for("manage_bills"))
 
-        db.session.add(Bill(name=name, amount=float(amount), due_date=due_date))
+        db.session.add(Bill(name=name, amount=float(amount), due_date=due_date, frequency=frequency))
         db.session.commit()
         flash("Bill added.", "success")
         return redirect(url_for("manage_bills"))
 
     bills = Bill.query.order_by(Bill.due_date.asc()).all()
-    return render_template("bills.html", bills=bills)
+    return render_template("bills.html", bills=bills, frequencies=BILL_FREQUENCIES)
 
 # ---------------- MONTHLY SCHEDULE ----------------
 
-@app.route("/schedule")
-def monthly_schedule():
-    y, m = parse_month_param(request.args.get("month"))
-    start, end = month_bounds(y, m)
-
+def schedule_month(start, end, bills, incomes):
+    """Planned rows, recurring bill entries and the cash-flow summary for one month."""
     items = PlannedPayment.query.filter(
         PlannedPayment.pay_date >= start,
         PlannedPayment.pay_date <= end
     ).order_by(PlannedPayment.pay_date.asc()).all()
 
-    by_day = {}
-    for it in items:
-        by_day.setdefault(it.pay_date, []).append(it)
-
-    debts = Debt.query.order_by(Debt.name.asc()).all()
-    bills = Bill.query.order_by(Bill.name.asc()).all()
-    incomes = Income.query.order_by(Income.name.asc()).all()
-
-    options = []
-    for d in debts:
-        options.append({"label": f"Debt: {d.name}", "name": d.name, "kind": "debt"})
-    for b in bills:
-        options.append({"label": f"Bill: {b.name}", "name": b.name, "kind": "bill"})
-    options.append({"label": "Other (custom)", "name": "__custom__", "kind": "other"})
-
-    # ---------- Month income (exact if next_pay_date exists) ----------
-    def _add_months(dt: date, months: int) -> date:
-        yy = dt.year + (dt.month - 1 + months) // 12
-        mm = (dt.month - 1 + months) % 12 + 1
-        dd = min(dt.day, calendar.monthrange(yy, mm)[1])
-        return date(yy, mm, dd)
-
-    def income_in_month(inc: Income, month_start: date, month_end: date) -> float:
-        # If no next pay date, we can't do "exact paycheck count"
-        if not inc.next_pay_date:
-            # fallback: normalized monthly for this one income
-            if inc.frequency == "Bi-weekly":
-                return (inc.amount * 26) / 12
-            if inc.frequency == "Weekly":
-                return (inc.amount * 52) / 12
-            return inc.amount
-
-        freq = (inc.frequency or "Monthly").strip()
-        amt = float(inc.amount)
-
-        # move forward to first pay date >= month_start
-        d = inc.next_pay_date
-        safety = 0
-        while d < month_start and safety < 500:
-            safety += 1
-            if freq == "Weekly":
-                d = d + timedelta(days=7)
-            elif freq == "Bi-weekly":
-                d = d + timedelta(days=14)
-            else:
-                d = _add_months(d, 1)
-
-        # count occurrences within the month
-        total = 0.0
-        safety = 0
-        while d <= month_end and safety < 500:
-            safety += 1
-            total += amt
-            if freq == "Weekly":
-                d = d + timedelta(days=7)
-            elif freq == "Bi-weekly":
-                d = d + timedelta(days=14)
-            else:
-                d = _add_months(d, 1)
+    # recurring bills show up on their due days without being re-entered
+    hand_scheduled = {it.name for it in items if it.kind == "bill"}
+    recurring = recurring_bill_items(bills, start, end, hand_scheduled)
+
+    # ---------- Month income vs planned ----------
+    rollup = planned_rollup(start, end).get(_rollup_month(start), {})
+    planned_total = sum(rollup.values()) + sum(it["amount"] for it in recurring)
+    return items, recurring, month_cashflow(incomes, start, end, planned_total)
+
+# Rendered calendar grids (plus the month summary) keyed by (household, month, data version):
+# any write bumps the version, so flipping between unchanged months re-renders nothing.
+fragment_cache = LRUCache(maxsize=int(os.environ.get("SCHEDULE_CACHE_MONTHS", 48)))
+options_cache = LRUCache(maxsize=16)
+
+def schedule_options(version):
+    """Add-item dropdown (debts, bills, custom), shared by every month at this data version."""
+    key = (current_household().name, version)
+    options = options_cache.get(key)
+    if options is None:
+        options = [{"label": f"Debt: {name}", "name": name, "kind": "debt"}
+                   for name in db.session.scalars(db.select(Debt.name).order_by(Debt.name))]
+        options += [{"label": f"Bill: {name}", "name": name, "kind": "bill"}
+                    for name in db.session.scalars(db.select(Bill.name).order_by(Bill.name))]
+        options.append({"label": "Other (custom)", "name": "__custom__", "kind": "other"})
+        options_cache.put(key, options)
+    return options
+
+def calendar_cells_for(y, m):
+    # pad to the starting weekday (Sun=0..Sat=6) and out to whole weeks
+    first_weekday = (date(y, m, 1).weekday() + 1) % 7
+    cells = [{"is_pad": True}] * first_weekday
+    cells += [{"is_pad": False, "date": date(y, m, day)} for day in range(1, calendar.monthrange(y, m)[1] + 1)]
+    cells += [{"is_pad": True}] * (-len(cells) % 7)
+    return cells
 
-        return total
-
-    any_has_next = any(i.next_pay_date for i in incomes)
-    if any_has_next:
-        month_income = sum(income_in_month(i, start, end) for i in incomes)
-    else:
-        # existing normalized monthly income
-        month_income = get_monthly_income_value()
-
-    planned_total = sum(float(it.amount) for it in items)
-    remainder = month_income - planned_total
-    coverage_pct = (planned_total / month_income * 100.0) if month_income > 0 else 0.0
-
-    schedule_summary = {
-        "month_income": month_income,
-        "planned_total": planned_total,
-        "remainder": remainder,
-        "coverage_pct": coverage_pct,
-        "any_has_next": any_has_next
-    }
-
-    # ---------- Build calendar cells (pad to start weekday) ----------
-    first_day = date(y, m, 1)
-    last_day_num = calendar.monthrange(y, m)[1]
-    first_weekday = (first_day.weekday() + 1) % 7  # Sun=0..Sat=6
-
-    calendar_cells = []
-    for _ in range(first_weekday):
-        calendar_cells.append({"is_pad": True})
-    for day in range(1, last_day_num + 1):
-        calendar_cells.append({"is_pad": False, "date": date(y, m, day)})
-    while len(calendar_cells) % 7 != 0:
-        calendar_cells.append({"is_pad": True})
-
-    month_label = date(y, m, 1).strftime("%B %Y")
+@app.route("/schedule")
+def monthly_schedule():
+    y, m = parse_month_param(request.args.get("month"))
     month_param = f"{y:04d}-{m:02d}"
-
+    version = data_version()
+    key = (current_household().name, month_param, version)
+
+    cached = fragment_cache.get(key)
+    if cached is None:
+        start, end = month_bounds(y, m)
+        bills = Bill.query.order_by(Bill.name.asc()).all()
+        incomes = Income.query.order_by(Income.name.asc()).all()
+
+        items, recurring, schedule_summary = schedule_month(start, end, bills, incomes)
+        by_day = {}
+        for it in items:
+            by_day.setdefault(it.pay_date, []).append(it)
+        for it in recurring:
+            by_day.setdefault(it["pay_date"], []).append(it)
+
+        grid = Markup(render_template(
+            "_schedule_grid.html",
+            by_day=by_day,
+            options=schedule_options(version),
+            month_param=month_param,
+            calendar_cells=calendar_cells_for(y, m),
+        ))
+        cached = (schedule_summary, grid)
+        fragment_cache.put(key, cached)
+
+    schedule_summary, grid = cached
     return render_template(
         "schedule.html",
-        by_day=by_day,
-        options=options,
-        month_label=month_label,
+        month_label=date(y, m, 1).strftime("%B %Y"),
         month_param=month_param,
-        calendar_cells=calendar_cells,
+        calendar_grid=grid,
         schedule_summary=schedule_summary
     )
 
@@ -493,59 +2922,713 @@ def delete_schedule_item(item_id):
     flash("Planned payment deleted.", "success")
     return redirect(url_for("monthly_schedule", month=month_param))
 
+# ---------------- PROJECTION ----------------
+
+PROJECTION_MAX_MONTHS = 120
+PROJECTION_FIELDS = ["month", "month_income", "planned_total", "remainder", "coverage_pct"]
+
+@app.route("/projection")
+def projection():
+    """
+    Month-by-month cash flow (the schedule summary) for a range of months.
+    ?from=YYYY-MM&months=N&format=ndjson|csv, streamed one row per month.
+    """
+    y, m = parse_month_param(request.args.get("from"))
+    months = int(_to_float(request.args.get("months"), 12) or 12)
+    months = min(max(months, 1), PROJECTION_MAX_MONTHS)
+    fmt = (request.args.get("format") or "ndjson").strip().lower()
+
+    first = date(y, m, 1)
+    last_month = add_months(first, months - 1)
+    _, last = month_bounds(last_month.year, last_month.month)
+
+    incomes = Income.query.all()
+    bills = Bill.query.all()
+
+    # planned totals for the whole range from the rollup table
+    planned = planned_rollup(first, last)
+
+    # bills already scheduled by hand, so recurring_bill_items doesn't count them twice
+    month_key = func.strftime("%Y-%m", PlannedPayment.pay_date)
+    hand_scheduled = {}
+    if bills:
+        for key, name in db.session.execute(
+            db.select(month_key, PlannedPayment.name).distinct()
+            .where(PlannedPayment.kind == "bill", PlannedPayment.pay_date >= first, PlannedPayment.pay_date <= last)
+        ):
+            hand_scheduled.setdefault(key, set()).add(name)
+
+    def month_rows():
+        for k in range(months):
+            start = add_months(first, k)
+            start, end = month_bounds(start.year, start.month)
+            key = start.strftime("%Y-%m")
+            recurring = recurring_bill_items(bills, start, end, hand_scheduled.get(key, ()))
+            planned_total = sum(planned.get(key, {}).values()) + sum(it["amount"] for it in recurring)
+            row = month_cashflow(incomes, start, end, planned_total)
+            yield {
+                "month": key,
+                "month_income": round(row["month_income"], 2),
+                "planned_total": round(row["planned_total"], 2),
+                "remainder": round(row["remainder"], 2),
+                "coverage_pct": round(row["coverage_pct"], 1),
+            }
+
+    if fmt == "csv":
+        def generate():
+            buf = io.StringIO()
+            writer = csv.DictWriter(buf, fieldnames=PROJECTION_FIELDS)
+            writer.writeheader()
+            for row in month_rows():
+                writer.writerow(row)
+                yield buf.getvalue()
+                buf.seek(0)
+                buf.truncate()
+            yield buf.getvalue()
+
+        filename = f"projection-{first.strftime('%Y-%m')}-{months}m.csv"
+        return Response(
+            stream_with_context(generate()),
+            mimetype="text/csv",
+            headers={"Content-Disposition": f"attachment; filename={filename}"},
+        )
+
+    def generate():
+        for row in month_rows():
+            yield json.dumps(row) + "\n"
+
+    return Response(stream_with_context(generate()), mimetype="application/x-ndjson")
+
+# ---------------- CSV IMPORT / EXPORT ----------------
+
+CSV_IMPORT_CHUNK = 500
+
+def _clean_str(val):
+    return (val or "").strip() or None
+
+def _parse_flag(val):
+    val = (val or "").strip().lower()
+    if val in ("1", "true", "yes", "y"):
+        return True
+    if val in ("0", "false", "no", "n"):
+        return False
+    return None
+
+def _parse_int(val):
+    num = _to_float((val or "").strip() or None)
+    return int(num) if num is not None and num.is_integer() else None
+
+def _parse_kind(val):
+    kind = (val or "debt").strip().lower()
+    return kind if kind in ("debt", "bill", "other") else "other"
+
+# category -> (model, [(csv column, model attr, parser, required)], export order)
+CSV_SPECS = {
+    "schedule": (PlannedPayment, [
+        ("pay_date", "pay_date", _parse_date, True),
+        ("name", "name", _clean_str, True),
+        ("amount", "amount", _to_float, True),
+        ("kind", "kind", _parse_kind, False),
+    ], PlannedPayment.pay_date),
+    "bills": (Bill, [
+        ("name", "name", _clean_str, True),
+        ("amount", "amount", _to_float, True),
+        ("due_date", "due_date", _parse_date, True),
+        ("frequency", "frequency", _parse_bill_frequency, False),
+    ], Bill.due_date),
+    "debt": (Debt, [
+        ("name", "name", _clean_str, True),
+        ("balance", "balance", _to_float, True),
+        ("apr", "interest_rate", _to_float, True),
+        ("min_payment", "min_payment", _to_float, True),
+        ("variable_rate", "variable_rate", _parse_flag, False),
+        ("priority", "priority", _parse_int, False),
+        ("promo_rate", "promo_rate", _to_float, False),
+        ("promo_end", "promo_end", _parse_date, False),
+        ("split_pct", "split_pct", _to_float, False),
+    ], Debt.name),
+}
+
+CSV_RETURN_ROUTES = {"schedule": "monthly_schedule", "bills": "manage_bills", "debt": "manage_debt"}
+
+app.jinja_env.globals["csv_columns"] = {cat: [c[0] for c in spec[1]] for cat, spec in CSV_SPECS.items()}
+
+def import_csv_rows(model, fields, lines):
+    """
+    Validate CSV rows and bulk insert them CSV_IMPORT_CHUNK at a time,
+    one transaction per chunk. Returns (inserted, [(line_no, reason), ...]).
+    """
+    reader = csv.DictReader(lines)
+    missing = [col for col, _, _, required in fields if required and col not in (reader.fieldnames or [])]
+    if missing:
+        return 0, [(1, "missing column(s): " + ", ".join(missing))]
+
+    inserted = 0
+    errors = []
+    chunk = []
+
+    def flush_chunk():
+        db.session.bulk_insert_mappings(model, chunk)
+        if model is PlannedPayment:
+            # likewise the rollup listener; apply the chunk's totals in the same transaction
+            apply_rollup_deltas(db.session.connection(), planned_rollup_deltas(
+                (row["pay_date"], row.get("kind"), row["amount"]) for row in chunk))
+        if model in _SIM_INPUT_MODELS:
+            # bulk inserts bypass the unit of work, so after_flush never sees them
+            db.session.info["sim_inputs_changed"] = True
+        bump_data_version(db.session.connection())
+        db.session.commit()
+
+    for line_no, raw in enumerate(reader, start=2):
+        row = {}
+        bad = None
+        for col, attr, parse, required in fields:
+            val = parse(raw.get(col))
+            if val is None and required:
+                bad = f"bad or missing {col}"
+                break
+            if val is not None:
+                row[attr] = val
+        if bad:
+            errors.append((line_no, bad))
+            continue
+
+        chunk.append(row)
+        if len(chunk) >= CSV_IMPORT_CHUNK:
+            flush_chunk()
+            inserted += len(chunk)
+            chunk = []
+
+    if chunk:
+        flush_chunk()
+        inserted += len(chunk)
+    return inserted, errors
+
+@app.route("/import/<string:category>", methods=["POST"])
+def import_csv(category):
+    if category not in CSV_SPECS:
+        flash("Invalid import category.", "danger")
+        return redirect(url_for("dashboard"))
+    back = url_for(CSV_RETURN_ROUTES[category])
+
+    upload = request.files.get("file")
+    if not upload or not upload.filename:
+        flash("Choose a CSV file to import.", "danger")
+        return redirect(back)
+
+    model, fields, _ = CSV_SPECS[category]
+    lines = io.TextIOWrapper(upload.stream, encoding="utf-8-sig", newline="")
+    try:
+        inserted, errors = import_csv_rows(model, fields, lines)
+    except (UnicodeDecodeError, csv.Error) as e:
+        db.session.rollback()
+        flash(f"Could not read CSV: {e}", "danger")
+        return redirect(back)
+
+    if inserted:
+        flash(f"Imported {inserted} row(s).", "success")
+    if errors:
+        shown = "; ".join(f"line {n}: {why}" for n, why in errors[:5])
+        more = f" (+{len(errors) - 5} more)" if len(errors) > 5 else ""
+        flash(f"Skipped {len(errors)} row(s): {shown}{more}", "danger")
+    if not inserted and not errors:
+        flash("CSV had no rows.", "danger")
+    return redirect(back)
+
+@app.route("/export/<string:category>.csv")
+def export_csv(category):
+    if category not in CSV_SPECS:
+        flash("Invalid export category.", "danger")
+        return redirect(url_for("dashboard"))
+
+    model, fields, order_col = CSV_SPECS[category]
+    header = [col for col, _, _, _ in fields]
+    columns = [getattr(model, attr) for _, attr, _, _ in fields]
+
+    def generate():
+        buf = io.StringIO()
+        writer = csv.writer(buf)
+        writer.writerow(header)
+        result = db.session.execute(
+            db.select(*columns).order_by(order_col, model.id).execution_options(yield_per=1000)
+        )
+        for part in result.partitions():
+            for row in part:
+                writer.writerow([v.isoformat() if isinstance(v, date) else v for v in row])
+            yield buf.getvalue()
+            buf.seek(0)
+            buf.truncate()
+        yield buf.getvalue()
+
+    return Response(
+        stream_with_context(generate()),
+        mimetype="text/csv",
+        headers={"Content-Disposition": f"attachment; filename={category}.csv"},
+    )
+
+# ---------------- PROJECTION SNAPSHOTS ----------------
+# The payoff page (what-if table + extra-vs-months curve) is computed off the
+# request path and stored in ProjectionSnapshot. Routes serve the stored copy
+# straight away; if its inputs no longer match, they flag it as recomputing and
+# queue a refresh. Debt/Income/Bill commits refresh every stored key.
+# Snapshots are keyed by the extra payment alone: the payload covers avalanche
+# and snowball whatever the current strategy. The "auto" key always stays; of
+# the keys for typed-in extras only the PROJECTION_KEEP most recently viewed are kept.
+
+PROJECTION_THREADS = int(os.environ.get("PROJECTION_THREADS", 1))
+# off by default: every gunicorn worker would start its own pool, and a 174-scenario
+# sweep only saves tens of ms over inline. Only the background worker ever uses it.
+PROJECTION_PROCESSES = int(os.environ.get("PROJECTION_PROCESSES", 0))
+PROJECTION_PARALLEL_MIN = 64  # scenarios; smaller sweeps run faster inline than shipped to processes
+PROJECTION_KEEP = int(os.environ.get("PROJECTION_KEEP", 8))  # override snapshots kept, besides the auto key
+PROJECTION_TOUCH = timedelta(minutes=5)  # how stale viewed_at may get before a view rewrites it
+WHATIF_BUMPS = [0, 100, 250, 500, 1000]
+CURVE_STEP = 25.0
+CURVE_POINTS = 81  # $0 .. $2000 extra
+
+# plain tuples pickle cheaply into pool processes (SQLAlchemy rows drag their metadata along)
+SweepDebt = namedtuple("SweepDebt", "name balance interest_rate min_payment priority promo_rate promo_end split_pct "
+                                    "variable_rate", defaults=(False,))
+
+def projection_key(extra_override):
+    return "auto" if extra_override is None else str(float(extra_override))
+
+def _projection_inputs():
+    return [SweepDebt(*d) for d in debt_rows()], leftover_cashflow()
+
+def _projection_hash(key, debts, cashflow):
+    raw = json.dumps([key, date.today().isoformat(), round(cashflow, 2), debts], default=str)
+    return hashlib.blake2b(raw.encode(), digest_size=16).hexdigest()
+
+def _sweep_chunk(debts, extras, methods, max_months):
+    # runs in a pool process
+    return simulate_payoff_many(debts, extras, methods, max_months)
+
+@timed_phase("sim")
+def sweep_payoffs(debts, extras, methods=("avalanche", "snowball"), max_months=600, parallel=False):
+    """
+    simulate_payoff_many; with parallel=True (background recomputes only),
+    big sweeps are split across the process pool.
+    """
+    methods = list(methods)
+    # spawning the pool takes ~1s, which a request must never wait on
+    pool = projection_worker.process_pool() if parallel else None
+    if pool is None or not debts or len(extras) * len(methods) < PROJECTION_PARALLEL_MIN:
+        return simulate_payoff_many(debts, extras, methods, max_months)
+
+    chunks = [list(c) for c in np.array_split(np.asarray(extras, dtype=np.float64), projection_worker.processes) if len(c)]
+    futures = [pool.submit(_sweep_chunk, debts, chunk, methods, max_months) for chunk in chunks]
+    out = {m: [] for m in methods}
+    for fut in futures:
+        part = fut.result()
+        for m in methods:
+            out[m].extend(part[m])
+    return out
+
+def compute_payoff_projection(debts, cashflow, extra_monthly, parallel=False):
+    """JSON-ready payoff page data: both methods at the current extra, the what-if table and the curve."""
+    extras = [extra_monthly] + [max(extra_monthly + bump, 0.0) for bump in WHATIF_BUMPS]
+    curve = [k * CURVE_STEP for k in range(CURVE_POINTS)]
+    runs = sweep_payoffs(debts, extras + curve, parallel=parallel)
+
+    def result(r):
+        months, payoff_date, interest = r
+        return {"months": months, "date": payoff_date.isoformat() if payoff_date else None,
+                "interest": interest, "unreachable": interest == float("inf")}
+
+    n = len(extras)
+    return {
+        "extra_monthly": extra_monthly,
+        "cashflow": cashflow,
+        "ava": result(runs["avalanche"][0]),
+        "snb": result(runs["snowball"][0]),
+        "scenarios": [{
+            "extra": extras[k],
+            "ava_months": runs["avalanche"][k][0],
+            "ava_interest": runs["avalanche"][k][2],
+            "snb_months": runs["snowball"][k][0],
+            "snb_interest": runs["snowball"][k][2],
+        } for k in range(1, n)],
+        "curve": {
+            "extras": curve,
+            # unreachable scenarios (minimums don't cover interest) plot as gaps
+            "avalanche": [r[0] if r[2] != float("inf") else None for r in runs["avalanche"][n:]],
+            "snowball": [r[0] if r[2] != float("inf") else None for r in runs["snowball"][n:]],
+        },
+    }
+
+def prune_projections():
+    """Drop all but the PROJECTION_KEEP most recently viewed override snapshots; "auto" always stays."""
+    override = ProjectionSnapshot.key != "auto"
+    keep = (
+        db.select(ProjectionSnapshot.key).where(override)
+        .order_by(func.coalesce(ProjectionSnapshot.viewed_at, ProjectionSnapshot.computed_at).desc())
+        .limit(PROJECTION_KEEP)
+    )
+    db.session.execute(db.delete(ProjectionSnapshot).where(override, ProjectionSnapshot.key.not_in(keep)))
+
+def store_projection(key, inputs_hash, payload, compute_ms):
+    now = datetime.now()
+    values = {"key": key, "inputs_hash": inputs_hash, "payload": json.dumps(payload),
+              "computed_at": now, "compute_ms": compute_ms}
+    stmt = sqlite_insert(ProjectionSnapshot).values(viewed_at=now, **values)
+    db.session.execute(stmt.on_conflict_do_update(
+        index_elements=[ProjectionSnapshot.key], set_={k: v for k, v in values.items() if k != "key"}
+    ))
+    # every extra a user tries gets its own key; without this the table grows forever
+    prune_projections()
+    # no bump_data_version: no user data changed, and /api/payoff's ETag reads computed_at itself
+    db.session.commit()
+    return now
+
+def recompute_projection(key):
+    debts, cashflow = _projection_inputs()
+    extra_monthly = max(cashflow, 0.0) if key == "auto" else max(float(key), 0.0)
+    digest = _projection_hash(key, debts, cashflow)
+    snap = db.session.get(ProjectionSnapshot, key)
+    if snap is not None and snap.inputs_hash == digest:
+        return
+    t0 = time.perf_counter()
+    payload = compute_payoff_projection(debts, cashflow, extra_monthly, parallel=True)
+    store_projection(key, digest, payload, (time.perf_counter() - t0) * 1000)
+
+class ProjectionWorker:
+    """
+    Background recompute queue: a thread pool for the recompute jobs and, with
+    PROJECTION_PROCESSES >= 2, a lazily started (spawn) process pool for big
+    scenario sweeps. Both are per process
+    and rebuilt after a fork, since gunicorn forks workers from a preloaded app.
+    """
+
+    def __init__(self, threads=1, processes=0):
+        self.threads = max(threads, 1)
+        self.processes = processes
+        self._pending = {}  # (household, key) -> "changed again while queued/running"
+        self._lock = threading.Lock()
+        self._thread_pool = None
+        self._process_pool = None
+        self._pid = None
+
+    def _check_fork(self):
+        if self._pid != os.getpid():
+            self._pid = os.getpid()
+            self._thread_pool = None
+            self._process_pool = None
+            self._pending.clear()
+
+    def submit(self, household, key):
+        """Queue a recompute of one household's key (None = every stored key); no-op if it's already queued."""
+        job = (household, key)
+        with self._lock:
+            self._check_fork()
+            if job in self._pending:
+                self._pending[job] = True
+                return
+            self._pending[job] = False
+            if self._thread_pool is None:
+                self._thread_pool = ThreadPoolExecutor(self.threads, thread_name_prefix="projection")
+            self._thread_pool.submit(self._run, household, key)
+
+    def is_pending(self, household, key):
+        with self._lock:
+            return (household, key) in self._pending or (household, None) in self._pending
+
+    def process_pool(self):
+        if self.processes < 2:
+            return None
+        with self._lock:
+            self._check_fork()
+            if self._process_pool is None:
+                self._process_pool = ProcessPoolExecutor(self.processes, mp_context=multiprocessing.get_context("spawn"))
+            return self._process_pool
+
+    def _run(self, household, key):
+        try:
+            with app.app_context():
+                g.household = households.get(household)
+                if g.household is None:
+                    return  # household removed since the job was queued
+                keys = [key] if key is not None else db.session.scalars(db.select(ProjectionSnapshot.key)).all()
+                for k in keys:
+                    recompute_projection(k)
+        except Exception:
+            app.logger.exception("projection recompute failed (%s: %s)", household, key or "all")
+        finally:
+            with self._lock:
+                again = self._pending.pop((household, key), False)
+            if again:
+                self.submit(household, key)
+
+projection_worker = ProjectionWorker(PROJECTION_THREADS, PROJECTION_PROCESSES)
+
 # ---------------- DEBT PAYOFF ----------------
 
+def payoff_data():
+    """
+    Payoff page data for the current strategy, from the ProjectionSnapshot of its extra payment.
+    Only the very first view of an extra computes inline; after that a stale
+    snapshot is served as-is (recomputing=True) while the worker refreshes it.
+    """
+    debts, cashflow = _projection_inputs()
+    method, extra_monthly = current_strategy(cashflow)
+    key = projection_key(session.get("extra_override"))
+    digest = _projection_hash(key, debts, cashflow)
+
+    snap = db.session.get(ProjectionSnapshot, key)
+    if snap is None:
+        t0 = time.perf_counter()
+        data = compute_payoff_projection(debts, cashflow, extra_monthly)
+        computed_at = store_projection(key, digest, data, (time.perf_counter() - t0) * 1000)
+        recomputing = False
+    else:
+        data = json.loads(snap.payload)
+        computed_at = snap.computed_at
+        recomputing = snap.inputs_hash != digest
+        if recomputing:
+            projection_worker.submit(current_household().name, key)
+        now = datetime.now()
+        if snap.viewed_at is None or now - snap.viewed_at > PROJECTION_TOUCH:
+            # core update: keeps it off the prune list without bumping the data version (nothing changed)
+            db.session.execute(db.update(ProjectionSnapshot).filter_by(key=key).values(viewed_at=now))
+            db.session.commit()
+
+    for r in (data["ava"], data["snb"]):
+        r["date"] = date.fromisoformat(r["date"]) if r["date"] else None
+    data.update(method=method, recomputing=recomputing, computed_at=computed_at)
+    return data
+
 @app.route("/payoff")
 def payoff():
-    debts = Debt.query.all()
-    monthly_income = get_monthly_income_value()
-    bills = Bill.query.all()
-    obligations = sum(b.amount for b in bills) + sum(d.min_payment for d in debts)
-    cashflow = monthly_income - obligations
-
-    method = session.get("strategy_method", get_setting("default_strategy", "avalanche") or "avalanche")
-    extra_override = session.get("extra_override", None)
-    extra_monthly = max(cashflow, 0.0) if extra_override is None else max(float(extra_override), 0.0)
+    return render_template("payoff.html", **payoff_data())
 
-    ava_m, ava_date, ava_int = simulate_payoff(debts, extra_monthly, "avalanche")
-    snb_m, snb_date, snb_int = simulate_payoff(debts, extra_monthly, "snowball")
-
-    # What-if table: extra amounts
-    bumps = [0, 100, 250, 500, 1000]
-    scenarios = []
-    for bump in bumps:
-        extra = max(extra_monthly + bump, 0.0)
-        m1, d1, i1 = simulate_payoff(debts, extra, "avalanche")
-        m2, d2, i2 = simulate_payoff(debts, extra, "snowball")
-        scenarios.append({
-            "extra": extra,
-            "ava_months": m1,
-            "ava_interest": i1,
-            "snb_months": m2,
-            "snb_interest": i2,
+@app.route("/payoff/solve")
+def payoff_solve():
+    """
+    ?target=YYYY-MM&method=<any STRATEGIES name> -> the smallest extra per month
+    that has every debt paid off by the end of the target month. ?extra= stands
+    in for the current extra that additional_needed is measured from.
+    """
+    target = (request.args.get("target") or "").strip()
+    try:
+        ty, tm = (int(x) for x in target.split("-"))
+        if tm < 1 or tm > 12:
+            raise ValueError
+    except ValueError:
+        return jsonify({"error": "target must be YYYY-MM"}), 400
+
+    today = date.today()
+    target_months = (ty - today.year) * 12 + (tm - today.month)
+    if target_months < 1:
+        return jsonify({"error": "target must be after the current month"}), 400
+
+    method, current_extra = requested_strategy()
+    debts = debt_rows()
+    extra, (months, payoff_date, total_interest), probes = solve_extra_for_target(debts, target_months, method)
+    return jsonify({
+        "target": f"{ty:04d}-{tm:02d}",
+        "target_months": target_months,
+        "method": method,
+        "extra_monthly": extra,
+        "current_extra": round(current_extra, 2),
+        "additional_needed": round(max(extra - current_extra, 0.0), 2),
+        "months": months,
+        "payoff_date": payoff_date.isoformat() if payoff_date else None,
+        "total_interest": round(total_interest, 2),
+        "probes": probes,
+    })
+
+RISK_DEFAULTS = {"rate_vol": 1.0, "rate_move_prob": 1 / 6, "miss_prob": 0.02, "cut_prob": 0.05, "cut_frac": 0.5}
+
+@app.route("/api/payoff/risk")
+def payoff_risk_api():
+    """
+    Monte Carlo payoff for the current strategy (or ?method=&extra=).
+    ?paths=N&target=YYYY-MM plus any of RISK_DEFAULTS to override the shock model.
+    Seeded, so the same inputs give the same answer (and the same ETag).
+    """
+    def build():
+        method, extra_monthly = requested_strategy()
+
+        target_months = None
+        target = (request.args.get("target") or "").strip()
+        if target:
+            ty, tm = parse_month_param(target)
+            today = date.today()
+            target_months = max((ty - today.year) * 12 + (tm - today.month), 0)
+
+        shocks = {k: min(max(_to_float(request.args.get(k), v), 0.0), 100.0) for k, v in RISK_DEFAULTS.items()}
+        for k in ("rate_move_prob", "miss_prob", "cut_prob", "cut_frac"):
+            shocks[k] = min(shocks[k], 1.0)
+
+        debts = debt_rows()
+        incomes = Income.query.all()
+        paths = int(_to_float(request.args.get("paths"), RISK_DEFAULT_PATHS) or RISK_DEFAULT_PATHS)
+
+        t0 = time.perf_counter()
+        risk = simulate_payoff_risk(debts, incomes, extra_monthly, method, paths, RISK_HORIZON, target_months,
+                                    seed=int(_to_float(request.args.get("seed"), 0) or 0), **shocks)
+        baseline_months, _, baseline_interest = simulate_payoff(debts, extra_monthly, method, RISK_HORIZON)
+        risk.update({
+            "method": method,
+            "extra_monthly": round(extra_monthly, 2),
+            "target": target or None,
+            "target_months": target_months,
+            "baseline_months": baseline_months if baseline_interest != float("inf") else None,
+            "variable_debts": sum(1 for d in debts if d.variable_rate),
+            "shocks": shocks,
+            "elapsed_ms": round((time.perf_counter() - t0) * 1000, 1),
         })
+        if risk["interest_p50"] is not None:
+            risk["interest_p50"] = round(risk["interest_p50"], 2)
+        return risk
+    return conditional_json(build)
 
-    return render_template(
-        "payoff.html",
-        method=method,
-        extra_monthly=extra_monthly,
-        cashflow=cashflow,
-        ava={"months": ava_m, "date": ava_date, "interest": ava_int, "unreachable": (ava_int == float("inf"))},
-        snb={"months": snb_m, "date": snb_date, "interest": snb_int, "unreachable": (snb_int == float("inf"))},
-        scenarios=scenarios
+@app.route("/api/payoff/timeline")
+def payoff_timeline_api():
+    """
+    Balance-by-debt-by-month for the current strategy (or ?method=&extra=).
+    ?points=N downsamples long horizons to about N rows (last month kept).
+    """
+    method, extra_monthly = requested_strategy()
+    debts = debt_rows()
+
+    months, payoff_date, total_interest, balances, payoff_months = simulate_payoff_timeline(
+        debts, extra_monthly, method
     )
 
+    idx = np.arange(balances.shape[0])
+    points = int(_to_float(request.args.get("points"), 0) or 0)
+    if points > 1 and idx.size > points:
+        step = math.ceil(idx.size / points)
+        idx = np.unique(np.append(idx[::step], idx[-1]))
+    sampled = balances[idx].astype(np.float64)
+
+    start = date.today()
+    return jsonify({
+        "method": method,
+        "extra_monthly": extra_monthly,
+        "months": months,
+        "payoff_date": payoff_date.isoformat() if payoff_date else None,
+        "total_interest": None if total_interest == float("inf") else round(total_interest, 2),
+        "month_index": idx.tolist(),
+        "labels": [add_months(start, int(k)).strftime("%Y-%m") for k in idx],
+        "total": sampled.sum(axis=1).round(2).tolist(),
+        "debts": [{
+            "name": d.name,
+            "payoff_month": int(payoff_months[i]) if payoff_months[i] >= 0 else None,
+            "balances": sampled[:, i].round(2).tolist(),
+        } for i, d in enumerate(debts)],
+    })
+
+# ---------------- JSON API ----------------
+# Same numbers as the pages, for in-place refresh. Responses carry a strong ETag
+# built from the data version plus everything else the payload depends on, so a
+# repeat poll with If-None-Match costs one indexed lookup and returns 304.
+
+def _json_num(x, digits=2):
+    return None if x is None or x == float("inf") else round(float(x), digits)
+
+def _json_payoff(r):
+    return {"months": r["months"], "date": r["date"].isoformat() if r["date"] else None,
+            "interest": _json_num(r["interest"])}
+
+def api_etag(*extra):
+    raw = "|".join(str(p) for p in (*extra,
+        current_household().name,  # versions are per household file
+        data_version(),
+        date.today().isoformat(),  # payoff dates roll with the calendar
+        request.full_path,
+        session.get("strategy_method"),
+        session.get("extra_override"),
+    ))
+    return hashlib.blake2b(raw.encode(), digest_size=12).hexdigest()
+
+def conditional_json(build, *version):
+    """
+    jsonify(build()) unless the client already has this version; build only runs on a miss.
+    `version`: anything else the payload depends on, beyond api_etag's parts.
+    """
+    etag = api_etag(*version)
+    if request.if_none_match.contains(etag):
+        resp = Response(status=304)
+    else:
+        resp = jsonify(build())
+    resp.set_etag(etag)
+    resp.headers["Cache-Control"] = "no-cache"
+    return resp
+
+@app.route("/api/summary")
+def api_summary():
+    def build():
+        summary, debt_chart = dashboard_data()
+        out = {k: _json_num(v) for k, v in summary.items() if isinstance(v, float)}
+        out.update({
+            "strategy_method": summary["strategy_method"],
+            "avalanche": _json_payoff(summary["ava"]),
+            "snowball": _json_payoff(summary["snb"]),
+            "strategies": {r["name"]: {"label": r["label"], "rank": r["rank"], **_json_payoff(r)}
+                           for r in summary["strategies"]},
+            "debts": debt_chart,
+        })
+        return out
+    return conditional_json(build)
+
+@app.route("/api/schedule")
+def api_schedule():
+    def build():
+        y, m = parse_month_param(request.args.get("month"))
+        start, end = month_bounds(y, m)
+        items, recurring, summary = schedule_month(start, end, Bill.query.all(), Income.query.all())
+        entries = [{"id": it.id, "date": it.pay_date.isoformat(), "name": it.name, "amount": float(it.amount),
+                    "kind": it.kind, "recurring": False} for it in items]
+        entries += [{"id": None, "date": it["pay_date"].isoformat(), "name": it["name"], "amount": it["amount"],
+                     "kind": it["kind"], "recurring": True} for it in recurring]
+        entries.sort(key=lambda e: e["date"])
+        return {
+            "month": f"{y:04d}-{m:02d}",
+            "summary": {k: (_json_num(v) if isinstance(v, float) else v) for k, v in summary.items()},
+            "items": entries,
+        }
+    return conditional_json(build)
+
+@app.route("/api/payoff")
+def api_payoff():
+    def build():
+        data = payoff_data()
+        return {
+            "method": data["method"],
+            "extra_monthly": _json_num(data["extra_monthly"]),
+            "cashflow": _json_num(data["cashflow"]),
+            "avalanche": _json_payoff(data["ava"]),
+            "snowball": _json_payoff(data["snb"]),
+            "scenarios": [{k: _json_num(v) if isinstance(v, float) else v for k, v in sc.items()}
+                          for sc in data["scenarios"]],
+            "curve": data["curve"],
+            "recomputing": data["recomputing"],
+            "computed_at": data["computed_at"].isoformat(timespec="seconds"),
+        }
+    # background recomputes don't touch the data version; the snapshot's own timestamp covers them
+    snapshot = db.session.execute(
+        db.select(ProjectionSnapshot.computed_at).filter_by(key=projection_key(session.get("extra_override")))
+    ).scalar()
+    return conditional_json(build, snapshot)
+
 # ---------------- SETTINGS ----------------
 
 @app.route("/settings", methods=["GET", "POST"])
 def settings():
     if request.method == "POST":
         default_strategy = request.form.get("default_strategy") or "avalanche"
-        set_setting("default_strategy", default_strategy)
+        if default_strategy not in STRATEGIES:
+            default_strategy = "avalanche"
 
         # placeholder toggles (you can add more)
         include_bills_in_dti = "1" if request.form.get("include_bills_in_dti") == "on" else "0"
-        set_setting("include_bills_in_dti", include_bills_in_dti)
+
+        set_settings({
+            "default_strategy": default_strategy,
+            "include_bills_in_dti": include_bills_in_dti,
+        })
 
         flash("Settings saved.", "success")
         return redirect(url_for("settings"))
@@ -554,7 +3637,8 @@ def settings():
         "default_strategy": get_setting("default_strategy", "avalanche"),
         "include_bills_in_dti": bool_setting("include_bills_in_dti", True)
     }
-    return render_template("settings.html", s=current)
+    known = [n for n in session_households() if households.exists(n)]
+    return render_template("settings.html", s=current, households=known)
 
 # ---------------- DELETE ----------------
 
@@ -572,4 +3656,5 @@ def delete_item(category, item_id):
     return redirect(request.referrer or url_for("dashboard"))
 
 if __name__ == "__main__":
+    # dev server; production runs under gunicorn (see gunicorn.conf.py)
     app.run(host="0.0.0.0", port=5000, debug=True)
@@ -129,6 +129,169 @@ function initPayoffCompareCharts(payoff) {
   }
 }
 
+async function initBalanceTimelineChart(url) {
+  const el = document.getElementById('balanceTimelineChart');
+  if (!el) return;
+
+  const resp = await fetch(url);
+  if (!resp.ok) return;
+  const timeline = await resp.json();
+
+  destroyIfExists("balanceTimelineChartInstance");
+  const ctx = el.getContext('2d');
+
+  const datasets = timeline.debts.map(d => ({
+    label: d.name,
+    data: d.balances,
+    fill: true,
+    pointRadius: 0,
+    borderWidth: 1,
+    tension: 0.2
+  }));
+
+  window.balanceTimelineChartInstance = new Chart(ctx, {
+    type: 'line',
+    data: { labels: timeline.labels, datasets },
+    options: {
+      interaction: { mode: 'index', intersect: false },
+      plugins: {
+        legend: { display: timeline.debts.length <= 12, position: 'bottom' },
+        tooltip: {
+          callbacks: { label: (ctx) => `${ctx.dataset.label}: $${Math.round(ctx.raw).toLocaleString()}` }
+        }
+      },
+      scales: {
+        x: { ticks: { color: '#cbd5e1', maxTicksLimit: 12 }, grid: { display: false } },
+        y: { stacked: true, ticks: { color: '#cbd5e1' }, grid: { color: 'rgba(148,163,184,0.10)' } }
+      }
+    }
+  });
+}
+
+function initPayoffRisk() {
+  const form = document.getElementById('payoffRiskForm');
+  const out = document.getElementById('payoffRiskResult');
+  if (!form || !out) return;
+
+  const months = (v) => (v == null ? `over ${out.dataset.horizon || 360}` : `${v}`);
+  const pct = (v) => `${Math.round(v * 100)}%`;
+
+  form.addEventListener('submit', async (e) => {
+    e.preventDefault();
+    out.textContent = 'Running…';
+    const params = new URLSearchParams(new FormData(form));
+    const resp = await fetch(`${form.action}?${params}`);
+    if (!resp.ok) {
+      out.textContent = 'Could not run the risk check.';
+      return;
+    }
+    const res = await resp.json();
+    out.dataset.horizon = res.horizon;
+    out.innerHTML =
+      `Debt-free in <span class="fw-bold text-white">${months(res.p50)}</span> months (median) • ` +
+      `P10 ${months(res.p10)} • P90 ${months(res.p90)}` +
+      (res.baseline_months != null ? ` • plan says ${res.baseline_months}` : '') +
+      (res.prob_by_target != null
+        ? ` • <span class="fw-bold text-success">${pct(res.prob_by_target)}</span> chance by ${res.target}`
+        : '') +
+      ` <span class="small">(${res.paths.toLocaleString()} paths, ${res.variable_debts} variable-rate)</span>`;
+  });
+}
+
+function initWhatIfCurveChart(curve) {
+  const el = document.getElementById('whatIfCurveChart');
+  if (!el) return;
+
+  destroyIfExists("whatIfCurveChartInstance");
+  const ctx = el.getContext('2d');
+
+  window.whatIfCurveChartInstance = new Chart(ctx, {
+    type: 'line',
+    data: {
+      labels: curve.extras.map(x => `$${Math.round(x).toLocaleString()}`),
+      datasets: [
+        { label: 'Avalanche', data: curve.avalanche, pointRadius: 0, borderWidth: 2, tension: 0.2 },
+        { label: 'Snowball', data: curve.snowball, pointRadius: 0, borderWidth: 2, tension: 0.2 }
+      ]
+    },
+    options: {
+      interaction: { mode: 'index', intersect: false },
+      plugins: {
+        legend: { position: 'bottom' },
+        tooltip: { callbacks: { label: (ctx) => `${ctx.dataset.label}: ${ctx.raw} months` } }
+      },
+      scales: {
+        x: { ticks: { color: '#cbd5e1', maxTicksLimit: 9 }, grid: { display: false } },
+        y: { ticks: { color: '#cbd5e1' }, grid: { color: 'rgba(148,163,184,0.10)' } }
+      }
+    }
+  });
+}
+
+function initPayoffSolver() {
+  const form = document.getElementById('payoffSolveForm');
+  const out = document.getElementById('payoffSolveResult');
+  if (!form || !out) return;
+
+  const money = (v) => `$${Math.round(v).toLocaleString()}`;
+
+  form.addEventListener('submit', async (e) => {
+    e.preventDefault();
+    const params = new URLSearchParams(new FormData(form));
+    const resp = await fetch(`${form.action}?${params}`);
+    const res = await resp.json();
+    if (!resp.ok) {
+      out.textContent = res.error || 'Could not solve for that month.';
+      return;
+    }
+    out.innerHTML =
+      `<span class="fw-bold text-success">${money(res.extra_monthly)}/mo extra</span> ` +
+      `(${res.additional_needed > 0 ? money(res.additional_needed) + ' more than now' : 'already covered'}) ` +
+      `• ${res.months} months • Interest: ${money(res.total_interest)}`;
+  });
+}
+
+function initLiveDashboard(url, intervalMs) {
+  if (!document.getElementById('dtiChart')) return;
+
+  let etag = null;
+  const formats = {
+    money: (v) => `$${Math.round(v).toLocaleString()}`,
+    pct: (v) => `${v.toFixed(1)}%`,
+    months: (v) => `${v} months`
+  };
+  const pick = (obj, path) => path.split('.').reduce((o, k) => (o == null ? o : o[k]), obj);
+
+  async function poll() {
+    if (document.hidden) return;
+    const resp = await fetch(url, { cache: 'no-store', headers: etag ? { 'If-None-Match': etag } : {} });
+    if (resp.status === 304 || !resp.ok) return;
+    etag = resp.headers.get('ETag');
+    const data = await resp.json();
+
+    document.querySelectorAll('[data-live]').forEach(el => {
+      const v = pick(data, el.dataset.live);
+      if (v == null) return;
+      el.textContent = (formats[el.dataset.liveFormat] || String)(v);
+    });
+
+    // update the existing charts in place instead of rebuilding them
+    const dti = window.dtiChartInstance;
+    if (dti) {
+      dti.data.datasets[0].data = [data.obligations, Math.max(data.cashflow, 0)];
+      dti.update();
+    }
+    const bars = window.debtBarChartInstance;
+    if (bars) {
+      bars.data.labels = data.debts.map(d => d.name);
+      bars.data.datasets[0].data = data.debts.map(d => d.balance);
+      bars.update();
+    }
+  }
+
+  setInterval(poll, intervalMs);
+}
+
 if (window.Chart) {
   Chart.defaults.color = "#cbd5e1";
   Chart.defaults.borderColor = "rgba(148,163,184,0.12)";
@@ -0,0 +1,93 @@
+"""
+Closed-loop HTTP load test for a running MadFinance server.
+
+Compare the dev server against gunicorn on the same database:
+
+    python app/main.py                                  # dev server on :5000
+    python bench/loadtest.py --url http://127.0.0.1:5000
+
+    gunicorn -c gunicorn.conf.py main:app               # production mode on :5000
+    python bench/loadtest.py --url http://127.0.0.1:5000
+
+Each client thread requests the paths round-robin for --duration seconds.
+Only the standard library is used, so this runs anywhere the app does.
+"""
+import argparse
+import json
+import statistics
+import threading
+import time
+import urllib.error
+import urllib.request
+
+DEFAULT_PATHS = ["/", "/schedule"]
+
+
+def _client(base, paths, stop_at, samples, errors):
+    opener = urllib.request.build_opener()
+    i = 0
+    while time.perf_counter() < stop_at:
+        path = paths[i % len(paths)]
+        i += 1
+        t0 = time.perf_counter()
+        try:
+            with opener.open(base + path, timeout=30) as resp:
+                resp.read()
+        except (urllib.error.URLError, OSError):
+            errors[path] = errors.get(path, 0) + 1
+            continue
+        samples.setdefault(path, []).append(time.perf_counter() - t0)
+
+
+def _pct(values, q):
+    values = sorted(values)
+    return values[min(int(q * len(values)), len(values) - 1)]
+
+
+def run(url, paths, concurrency, duration):
+    base = url.rstrip("/")
+    stop_at = time.perf_counter() + duration
+    per_thread = [({}, {}) for _ in range(concurrency)]
+    threads = [
+        threading.Thread(target=_client, args=(base, paths, stop_at, s, e), daemon=True)
+        for s, e in per_thread
+    ]
+    started = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - started
+
+    report = {"url": base, "concurrency": concurrency, "duration_s": round(elapsed, 2), "paths": {}}
+    for path in paths:
+        lat = [x for s, _ in per_thread for x in s.get(path, [])]
+        errs = sum(e.get(path, 0) for _, e in per_thread)
+        if not lat:
+            report["paths"][path] = {"requests": 0, "errors": errs}
+            continue
+        report["paths"][path] = {
+            "requests": len(lat),
+            "errors": errs,
+            "rps": round(len(lat) / elapsed, 1),
+            "p50_ms": round(statistics.median(lat) * 1000, 2),
+            "p95_ms": round(_pct(lat, 0.95) * 1000, 2),
+            "p99_ms": round(_pct(lat, 0.99) * 1000, 2),
+        }
+    total = sum(p["requests"] for p in report["paths"].values())
+    report["total_rps"] = round(total / elapsed, 1)
+    return report
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--url", default="http://127.0.0.1:5000")
+    ap.add_argument("--paths", nargs="+", default=DEFAULT_PATHS)
+    ap.add_argument("--concurrency", type=int, default=16)
+    ap.add_argument("--duration", type=float, default=15.0)
+    args = ap.parse_args()
+    print(json.dumps(run(args.url, args.paths, args.concurrency, args.duration), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""
+Month-range query on PlannedPayment with and without the pay_date index.
+
+    python bench/schedule_query.py --rows 100000
+
+Builds a throwaway SQLite file (MADFINANCE_DB) with --rows planned payments
+spread over ten years, then times the monthly_schedule query for random
+months with the index in place and again after dropping it.
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _time_months(main, months, repeat):
+    PlannedPayment = main.PlannedPayment
+    lat = []
+    for _ in range(repeat):
+        for y, m in months:
+            start, end = main.month_bounds(y, m)
+            t0 = time.perf_counter()
+            PlannedPayment.query.filter(
+                PlannedPayment.pay_date >= start,
+                PlannedPayment.pay_date <= end
+            ).order_by(PlannedPayment.pay_date.asc()).all()
+            lat.append(time.perf_counter() - t0)
+            main.db.session.expunge_all()
+    lat.sort()
+    return {"p50_ms": round(lat[len(lat) // 2] * 1000, 3), "mean_ms": round(sum(lat) / len(lat) * 1000, 3)}
+
+
+def _plan(main):
+    sql = ("EXPLAIN QUERY PLAN SELECT * FROM planned_payment "
+           "WHERE pay_date >= '2030-01-01' AND pay_date <= '2030-01-31' ORDER BY pay_date")
+    return [row[-1] for row in main.db.session.execute(main.db.text(sql))]
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--rows", type=int, default=100_000)
+    ap.add_argument("--months", type=int, default=24, help="distinct months queried per pass")
+    ap.add_argument("--repeat", type=int, default=5)
+    args = ap.parse_args()
+
+    tmp = tempfile.mkdtemp(prefix="madfinance-bench-")
+    os.environ["MADFINANCE_DB"] = os.path.join(tmp, "bench.db")
+    sys.path.insert(0, os.path.join(ROOT, "app"))
+    import main as app_main
+
+    rng = random.Random(42)
+    first = date(2025, 1, 1)
+    rows = [{
+        "pay_date": first + timedelta(days=rng.randrange(3650)),
+        "name": f"Payee {rng.randrange(40)}",
+        "amount": round(rng.uniform(10, 900), 2),
+        "kind": rng.choice(["debt", "bill", "other"]),
+    } for _ in range(args.rows)]
+    months = [(2025 + rng.randrange(10), rng.randrange(1, 13)) for _ in range(args.months)]
+
+    with app_main.app.app_context():
+        db = app_main.db
+        db.session.bulk_insert_mappings(app_main.PlannedPayment, rows)
+        db.session.commit()
+        db.session.execute(db.text("ANALYZE"))
+
+        report = {"rows": args.rows, "indexed": {}, "unindexed": {}}
+        report["indexed"]["plan"] = _plan(app_main)
+        report["indexed"].update(_time_months(app_main, months, args.repeat))
+
+        db.session.execute(db.text("DROP INDEX ix_planned_payment_pay_date"))
+        db.session.commit()
+        db.session.remove()
+        db.engine.dispose()  # pooled connections keep the old query plans cached
+        report["unindexed"]["plan"] = _plan(app_main)
+        report["unindexed"].update(_time_months(app_main, months, args.repeat))
+
+        report["speedup"] = round(report["unindexed"]["mean_ms"] / report["indexed"]["mean_ms"], 1)
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
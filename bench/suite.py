@@ -0,0 +1,233 @@
+"""
+Reproducible benchmarks for the simulation, schedule and dashboard hot paths.
+
+    python bench/suite.py --out before.json                  # on the old commit
+    python bench/suite.py --out after.json --compare before.json --threshold 0.15
+
+Fills a throwaway SQLite file (MADFINANCE_DB) with seeded synthetic data
+(--debts, --bills, --incomes, --planned), then times:
+
+  * simulate_payoff for both methods over a spread of extra payments
+  * simulate_payoff_many (the dashboard/payoff scenario grid)
+  * income_in_month for months up to --horizon years out
+  * the /, /payoff and /schedule routes through Flask's test client,
+    cold (sim, schedule fragment and options caches and stored payoff
+    projections all dropped before every call) and warm
+
+Each benchmark reports min/median/mean in ms over --repeat runs. With
+--compare, any benchmark whose median grew by more than --threshold
+(fractional, default 0.2) against the baseline JSON is listed and the
+exit status is 1, so the script can gate a CI step.
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import statistics
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+FREQUENCIES = ["Monthly", "Bi-weekly", "Weekly"]
+KINDS = ["debt", "bill", "other"]
+
+
+# ---------------- synthetic data ----------------
+
+def gen_debts(rng, n):
+    rows = []
+    for i in range(n):
+        balance = round(rng.uniform(300, 25000), 2)
+        rows.append({
+            "name": f"Debt {i:03d}",
+            "balance": balance,
+            "interest_rate": round(rng.choice([0.0, rng.uniform(3, 12), rng.uniform(15, 32)]), 2),
+            # 1.5%-4% of balance, never below $25 (typical card terms)
+            "min_payment": round(max(25.0, balance * rng.uniform(0.015, 0.04)), 2),
+        })
+    return rows
+
+
+def gen_bills(rng, n, first):
+    return [{
+        "name": f"Bill {i:03d}",
+        "amount": round(rng.uniform(15, 400), 2),
+        "due_date": first + timedelta(days=rng.randrange(28)),
+    } for i in range(n)]
+
+
+def gen_incomes(rng, n, first):
+    return [{
+        "name": f"Income {i:02d}",
+        "amount": round(rng.uniform(800, 4000), 2),
+        "frequency": rng.choice(FREQUENCIES),
+        "next_pay_date": first + timedelta(days=rng.randrange(14)),
+    } for i in range(n)]
+
+
+def gen_planned(rng, n, first, years=3):
+    return [{
+        "pay_date": first + timedelta(days=rng.randrange(365 * years)),
+        "name": f"Payee {rng.randrange(60)}",
+        "amount": round(rng.uniform(10, 900), 2),
+        "kind": rng.choice(KINDS),
+    } for _ in range(n)]
+
+
+# ---------------- timing ----------------
+
+def drop_caches(main):
+    # everything a route can serve without recomputing; older trees (the
+    # --compare baseline) may lack some of these, so each one is optional
+    for name in ("sim_cache", "fragment_cache", "options_cache"):
+        cache = getattr(main, name, None)
+        if cache is not None:
+            cache.clear()
+    if hasattr(main, "ProjectionSnapshot"):
+        with main.app.app_context():
+            main.db.session.execute(main.db.delete(main.ProjectionSnapshot))
+            main.db.session.commit()
+
+
+def measure(fn, repeat, warmup=1):
+    for _ in range(warmup):
+        fn()
+    samples = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - t0) * 1000)
+    return {
+        "min_ms": round(min(samples), 4),
+        "median_ms": round(statistics.median(samples), 4),
+        "mean_ms": round(statistics.fmean(samples), 4),
+        "runs": repeat,
+    }
+
+
+def run_suite(main, args):
+    rng = random.Random(args.seed)
+    first = date.today().replace(day=1)
+    results = {}
+
+    with main.app.app_context():
+        db = main.db
+        db.session.bulk_insert_mappings(main.Debt, gen_debts(rng, args.debts))
+        db.session.bulk_insert_mappings(main.Bill, gen_bills(rng, args.bills, first))
+        db.session.bulk_insert_mappings(main.Income, gen_incomes(rng, args.incomes, first))
+        db.session.bulk_insert_mappings(main.PlannedPayment, gen_planned(rng, args.planned, first))
+        # bulk inserts skip the ORM flush hooks, so build the month rollups the routes read
+        if hasattr(main, "rebuild_monthly_rollups"):
+            main.rebuild_monthly_rollups(db.session.connection())
+        db.session.commit()
+        db.session.execute(db.text("ANALYZE"))
+
+        debts = main.Debt.query.all()
+        incomes = main.Income.query.all()
+        extras = [0.0, 100.0, 500.0, 2000.0]
+
+        # engine timings: clear the cache so every call actually simulates
+        for method in ("avalanche", "snowball"):
+            for extra in extras:
+                def sim(method=method, extra=extra):
+                    main.sim_cache.clear()
+                    main.simulate_payoff(debts, extra, method)
+                results[f"simulate_payoff[{method},extra={extra:g}]"] = measure(sim, args.repeat)
+
+        def sim_many():
+            main.sim_cache.clear()
+            main.simulate_payoff_many(debts, [0.0, 50.0, 100.0, 250.0, 500.0, 1000.0])
+        results["simulate_payoff_many[6x2]"] = measure(sim_many, args.repeat)
+
+        months = [main.month_bounds(first.year + k, first.month) for k in range(0, args.horizon + 1, 5)]
+
+        def income_far():
+            for start, end in months:
+                for inc in incomes:
+                    main.income_in_month(inc, start, end)
+        results[f"income_in_month[{len(incomes)}x{len(months)} months, <= {args.horizon}y]"] = measure(income_far, args.repeat)
+
+        db.session.remove()
+
+    client = main.app.test_client()
+    with client.session_transaction() as sess:
+        # trees with household access codes only serve browsers that joined one; older ones ignore these keys
+        sess["households"], sess["household"] = ["default"], "default"
+    month_param = f"{first.year:04d}-{first.month:02d}"
+    routes = [("/", "/"), ("/payoff", "/payoff"), ("/schedule", f"/schedule?month={month_param}")]
+    for label, path in routes:
+        def cold(path=path):
+            drop_caches(main)
+            assert client.get(path).status_code == 200
+        def warm(path=path):
+            assert client.get(path).status_code == 200
+        results[f"route {label} [cold]"] = measure(cold, args.repeat)
+        results[f"route {label} [warm]"] = measure(warm, args.repeat)
+
+    return results
+
+
+def compare(results, baseline, threshold):
+    regressions = []
+    for name, cur in results.items():
+        old = baseline.get(name)
+        if not old or not old.get("median_ms"):
+            continue
+        ratio = cur["median_ms"] / old["median_ms"]
+        cur["vs_baseline"] = round(ratio, 3)
+        if ratio > 1 + threshold:
+            regressions.append((name, old["median_ms"], cur["median_ms"], ratio))
+    return regressions
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--debts", type=int, default=40)
+    ap.add_argument("--bills", type=int, default=60)
+    ap.add_argument("--incomes", type=int, default=4)
+    ap.add_argument("--planned", type=int, default=5000)
+    ap.add_argument("--horizon", type=int, default=50, help="years out for income_in_month")
+    ap.add_argument("--repeat", type=int, default=20)
+    ap.add_argument("--seed", type=int, default=42)
+    ap.add_argument("--out", help="write the JSON report here (default: stdout only)")
+    ap.add_argument("--compare", help="baseline JSON from an earlier run")
+    ap.add_argument("--threshold", type=float, default=0.2, help="allowed fractional median slowdown")
+    args = ap.parse_args()
+
+    tmp = tempfile.mkdtemp(prefix="madfinance-bench-")
+    os.environ["MADFINANCE_DB"] = os.path.join(tmp, "bench.db")
+    sys.path.insert(0, os.path.join(ROOT, "app"))
+    import main as app_main
+
+    results = run_suite(app_main, args)
+    report = {
+        "params": {k: getattr(args, k) for k in ("debts", "bills", "incomes", "planned", "horizon", "repeat", "seed")},
+        "python": platform.python_version(),
+        "results": results,
+    }
+
+    regressions = []
+    if args.compare:
+        with open(args.compare) as fh:
+            baseline = json.load(fh)
+        if baseline.get("params") != report["params"]:
+            print("warning: baseline was run with different params", file=sys.stderr)
+        regressions = compare(results, baseline.get("results", {}), args.threshold)
+
+    text = json.dumps(report, indent=2)
+    if args.out:
+        with open(args.out, "w") as fh:
+            fh.write(text + "\n")
+    print(text)
+
+    for name, old, new, ratio in regressions:
+        print(f"REGRESSION {name}: {old:.3f}ms -> {new:.3f}ms (x{ratio:.2f})", file=sys.stderr)
+    sys.exit(1 if regressions else 0)
+
+
+if __name__ == "__main__":
+    main()
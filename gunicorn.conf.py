@@ -0,0 +1,38 @@
+# Production server config: gunicorn -c gunicorn.conf.py main:app
+import multiprocessing
+import os
+import tempfile
+
+chdir = os.path.join(os.path.dirname(os.path.abspath(__file__)), "app")
+bind = os.environ.get("BIND", "0.0.0.0:5000")
+
+# gthread workers: a few processes, each with a thread pool sharing one SQLAlchemy pool
+worker_class = "gthread"
+workers = int(os.environ.get("WEB_CONCURRENCY", min(multiprocessing.cpu_count(), 4)))
+threads = int(os.environ.get("THREADS", 4))
+timeout = 60
+keepalive = 5
+
+# Import the app (and run db.create_all) once in the master instead of racing in every worker.
+preload_app = True
+accesslog = "-"
+
+# workers share /metrics counts through this dir (see METRICS in main.py); a
+# fresh private (0700) one per server start, set before the app is preloaded
+os.environ.setdefault("METRICS_DIR", tempfile.mkdtemp(prefix="madfinance-metrics-"))
+
+
+def post_fork(server, worker):
+    # don't share SQLite connections opened in the master across forked workers
+    from main import app, db, households
+
+    with app.app_context():
+        db.engine.dispose(close=False)
+        households.dispose(close=False)
+
+
+def when_ready(server):
+    # compile every template once in the master (and into the Jinja bytecode cache)
+    from main import warm_templates
+
+    warm_templates()
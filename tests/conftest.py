@@ -0,0 +1,8 @@
+import os
+import sys
+import tempfile
+
+# every test module shares one throwaway data dir; never the real database
+os.environ["MADFINANCE_DB"] = os.path.join(tempfile.mkdtemp(prefix="madfinance-test-"), "test.db")
+os.environ.pop("TRUST_HOUSEHOLD_HEADER", None)
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "app"))
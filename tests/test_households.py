@@ -0,0 +1,116 @@
+"""
+Household access: the session gate, access codes and the trusted X-Household header.
+
+    python -m pytest tests
+"""
+import re
+
+import pytest
+
+import main
+
+
+def add_debt(household, balance):
+    with main.app.app_context():
+        main.g.household = household
+        main.db.session.add(main.Debt(name="Card", balance=balance, interest_rate=20.0, min_payment=50.0))
+        main.db.session.commit()
+        main.db.session.remove()
+
+
+def create(client, name):
+    page = client.post("/household", data={"action": "create", "name": name}, follow_redirects=True)
+    return re.search(r"access code is (\S+);", page.get_data(as_text=True)).group(1)
+
+
+def join(client, name, code):
+    return client.post("/household", data={"action": "join", "name": name, "code": code}, follow_redirects=True)
+
+
+def total_debt(client, **kw):
+    resp = client.get("/api/summary", **kw)
+    return resp.status_code, resp.get_json() and resp.get_json()["total_debt"]
+
+
+@pytest.fixture(scope="module")
+def homes():
+    # two households with different data, plus the default one's access code
+    client = main.app.test_client()
+    codes = {name: create(client, name) for name in ("alpha", "beta")}
+    codes[main.DEFAULT_HOUSEHOLD] = main.new_access_code(main.households.default)
+    add_debt(main.households.get("alpha"), 1000.0)
+    add_debt(main.households.get("beta"), 2000.0)
+    return codes
+
+
+def test_secret_key_is_not_the_public_default():
+    assert main.app.secret_key and main.app.secret_key != "finance_strategy_engine_secret"
+
+
+def test_anonymous_browser_reaches_no_household(homes):
+    client = main.app.test_client()
+    assert client.get("/").status_code == 302
+    assert client.get("/").headers["Location"].endswith("/household")
+    assert client.get("/api/summary").status_code == 401
+    assert client.get("/household").status_code == 200
+
+
+def test_default_household_needs_its_code(homes):
+    client = main.app.test_client()
+    join(client, main.DEFAULT_HOUSEHOLD, "not-the-code")
+    assert client.get("/api/summary").status_code == 401
+    join(client, main.DEFAULT_HOUSEHOLD, homes[main.DEFAULT_HOUSEHOLD])
+    assert client.get("/api/summary").status_code == 200
+
+
+def test_unknown_household_is_rejected(homes):
+    client = main.app.test_client()
+    page = join(client, "nobody-here", "whatever").get_data(as_text=True)
+    assert "Unknown household or wrong access code." in page
+    assert client.get("/api/summary").status_code == 401
+
+
+def test_wrong_access_code_is_rejected(homes):
+    client = main.app.test_client()
+    page = join(client, "alpha", homes["beta"]).get_data(as_text=True)
+    assert "Unknown household or wrong access code." in page
+    assert client.get("/api/summary").status_code == 401
+
+
+def test_access_code_admits_only_that_household(homes):
+    client = main.app.test_client()
+    join(client, "alpha", homes["alpha"])
+    assert total_debt(client) == (200, 1000.0)
+    assert client.get("/settings").status_code == 200
+    # picking a household this browser never joined falls back to one it did
+    with client.session_transaction() as s:
+        s["household"] = "beta"
+    assert total_debt(client) == (200, 1000.0)
+    client.post("/household", data={"action": "switch", "name": "beta"})
+    assert total_debt(client) == (200, 1000.0)
+
+
+def test_create_refuses_a_taken_name(homes):
+    client = main.app.test_client()
+    page = client.post("/household", data={"action": "create", "name": "alpha"}, follow_redirects=True)
+    assert "is taken" in page.get_data(as_text=True)
+    assert client.get("/api/summary").status_code == 401
+
+
+def test_header_ignored_unless_trusted(homes):
+    client = main.app.test_client()
+    join(client, "alpha", homes["alpha"])
+    assert total_debt(client, headers={"X-Household": "beta"}) == (200, 1000.0)
+
+
+def test_pinned_header_cannot_be_overridden(homes, monkeypatch):
+    monkeypatch.setattr(main, "TRUST_HOUSEHOLD_HEADER", True)
+    client = main.app.test_client()
+    join(client, "alpha", homes["alpha"])  # refused: the header decides
+    pinned = {"headers": {"X-Household": "beta"}}
+    assert total_debt(client, **pinned) == (200, 2000.0)
+    client.post("/household", data={"action": "join", "name": "alpha", "code": homes["alpha"]}, **pinned)
+    with client.session_transaction() as s:
+        s["households"], s["household"] = ["alpha"], "alpha"
+    assert total_debt(client, **pinned) == (200, 2000.0)
+    assert client.get("/api/summary", headers={"X-Household": "nobody-here"}).status_code == 404
@@ -0,0 +1,171 @@
+"""
+Chunked CSV import (valid and invalid rows mixed, the per-line error report)
+and MonthlyRollup staying equal to a full rebuild through adds, edits and deletes.
+
+    python -m pytest tests
+"""
+import io
+from contextlib import contextmanager
+from datetime import date
+
+import pytest
+
+import main
+
+
+@pytest.fixture
+def home(request):
+    # a fresh household per test, so rollups start empty
+    name = "t-" + request.node.name.replace("_", "-")[:40]
+    household = main.households.get(name) or main.households.create(name)
+    client = main.app.test_client()
+    with client.session_transaction() as sess:
+        sess["households"] = [name]
+        sess["household"] = name
+    return household, client
+
+
+@contextmanager
+def orm(household):
+    with main.app.app_context():
+        main.g.household = household
+        yield main.db.session
+        main.db.session.remove()
+
+
+def rollup_rows(conn):
+    # rows the deltas took back to zero are left behind; a rebuild doesn't write them
+    return sorted(conn.execute(
+        main.db.select(main.MonthlyRollup.month, main.MonthlyRollup.kind, main.MonthlyRollup.total, main.MonthlyRollup.count)
+        .where(main.MonthlyRollup.count != 0)
+    ).all())
+
+
+def kept_and_rebuilt(household):
+    with household.engine.connect() as conn:
+        kept = rollup_rows(conn)
+        main.rebuild_monthly_rollups(conn)
+        rebuilt = rollup_rows(conn)
+        conn.rollback()
+    return kept, rebuilt
+
+
+def assert_rollups_match(household):
+    kept, rebuilt = kept_and_rebuilt(household)
+    assert kept == rebuilt
+    return kept
+
+
+def upload(client, category, text):
+    data = {"file": (io.BytesIO(text.encode()), f"{category}.csv")}
+    resp = client.post(f"/import/{category}", data=data, content_type="multipart/form-data", follow_redirects=True)
+    assert resp.status_code == 200
+    return resp.get_data(as_text=True)
+
+
+def test_chunked_import_keeps_good_rows_and_reports_bad_lines(home, monkeypatch):
+    household, client = home
+    monkeypatch.setattr(main, "CSV_IMPORT_CHUNK", 3)
+    page = upload(client, "schedule", "\n".join([
+        "pay_date,name,amount,kind",
+        "2026-03-01,Rent,1200.00,bill",        # line 2
+        "not-a-date,Rent,1200.00,bill",        # line 3
+        "2026-03-05,Card,150.25,debt",         # line 4
+        "2026-03-15,Car,310.10,",              # line 5: kind defaults to debt
+        "2026-03-20,Gym,,other",               # line 6
+        "2026-04-01,Rent,1200.00,bill",        # line 7
+        "2026-04-05,Card,150.25,debt",         # line 8
+        "2026-04-09,,12.00,other",             # line 9
+        "2026-04-20,Gift,40.00,whatever",      # line 10: unknown kinds are other
+    ]) + "\n")
+
+    assert "Imported 6 row(s)." in page
+    assert ("Skipped 3 row(s): line 3: bad or missing pay_date; "
+            "line 6: bad or missing amount; line 9: bad or missing name") in page
+    with orm(household) as session:
+        assert session.query(main.PlannedPayment).count() == 6
+    assert assert_rollups_match(household) == [
+        ("2026-03", "bill", 1200.0, 1),
+        ("2026-03", "debt", 460.35, 2),
+        ("2026-04", "bill", 1200.0, 1),
+        ("2026-04", "debt", 150.25, 1),
+        ("2026-04", "other", 40.0, 1),
+    ]
+
+
+def test_import_error_report_is_capped(home):
+    _, client = home
+    page = upload(client, "debt", "name,balance,apr,min_payment\n" + "Card,x,19.99,25\n" * 8)
+    assert "Imported" not in page
+    assert "Skipped 8 row(s): line 2: bad or missing balance; " in page
+    assert "line 6: bad or missing balance (+3 more)" in page
+
+
+def test_import_needs_the_required_columns(home):
+    _, client = home
+    page = upload(client, "bills", "name,due_date\nRent,2026-03-01\n")
+    assert "line 1: missing column(s): amount" in page
+
+
+def test_import_rows_across_chunks(home, monkeypatch):
+    household, _ = home
+    monkeypatch.setattr(main, "CSV_IMPORT_CHUNK", 4)
+    lines = ["pay_date,name,amount,kind"] + [
+        f"2026-{1 + i % 3:02d}-10,Item {i},{i}.25,{'bill' if i % 2 else 'debt'}" if i % 5 else "bad,row,,"
+        for i in range(1, 23)
+    ]
+    with orm(household):
+        inserted, errors = main.import_csv_rows(main.PlannedPayment, main.CSV_SPECS["schedule"][1], lines)
+    assert inserted == 18
+    assert [n for n, _ in errors] == [6, 11, 16, 21]
+    assert assert_rollups_match(household)
+
+
+def test_rollups_follow_schedule_adds_edits_and_deletes(home):
+    household, client = home
+    for pay_date, name, amount, kind in [("2026-05-01", "Rent", "1200", "bill"), ("2026-05-03", "Card", "150.50", "debt"),
+                                         ("2026-05-20", "Card", "99.99", "debt"), ("2026-06-01", "Rent", "1200", "bill")]:
+        client.post("/schedule/add", data={"pay_date": pay_date, "sel_name": name, "amount": amount, "kind": kind})
+    assert assert_rollups_match(household) == [
+        ("2026-05", "bill", 1200.0, 1), ("2026-05", "debt", 250.49, 2), ("2026-06", "bill", 1200.0, 1),
+    ]
+
+    with orm(household) as session:
+        rent, card, card2, june = session.query(main.PlannedPayment).order_by(main.PlannedPayment.id).all()
+        card.amount = 175.00                # amount
+        card2.pay_date = date(2026, 6, 20)  # month
+        rent.kind = "other"                 # kind
+        june.amount, june.pay_date = 1250.00, date(2026, 7, 1)
+        session.commit()
+    assert assert_rollups_match(household) == [
+        ("2026-05", "debt", 175.0, 1), ("2026-05", "other", 1200.0, 1),
+        ("2026-06", "debt", 99.99, 1), ("2026-07", "bill", 1250.0, 1),
+    ]
+
+    with orm(household) as session:
+        ids = [p.id for p in session.query(main.PlannedPayment).order_by(main.PlannedPayment.id)]
+    client.get(f"/schedule/delete/{ids[0]}")
+    with orm(household) as session:
+        session.delete(session.get(main.PlannedPayment, ids[3]))
+        session.commit()
+    assert assert_rollups_match(household) == [("2026-05", "debt", 175.0, 1), ("2026-06", "debt", 99.99, 1)]
+
+
+def test_bill_rows_leave_rollups_alone(home):
+    # recurring bills are added to a month's schedule when it's shown, never stored as planned payments
+    household, client = home
+    client.post("/schedule/add", data={"pay_date": "2026-05-01", "sel_name": "Rent", "amount": "1200", "kind": "bill"})
+    before = assert_rollups_match(household)
+
+    client.post("/bills", data={"name": "Water", "amount": "45.10", "due_date": "2026-05-12", "frequency": "Monthly"})
+    assert assert_rollups_match(household) == before
+    with orm(household) as session:
+        bill = session.query(main.Bill).one()
+        bill.amount, bill.frequency = 60.00, "Weekly"
+        session.commit()
+        bill_id = bill.id
+    assert assert_rollups_match(household) == before
+    client.get(f"/delete/bill/{bill_id}")
+    assert assert_rollups_match(household) == before
+    with orm(household) as session:
+        assert session.query(main.Bill).count() == 0
@@ -0,0 +1,30 @@
+"""
+/metrics merges the per-worker dumps in METRICS_DIR.
+
+    python -m pytest tests
+"""
+import json
+import os
+
+import main
+
+
+def test_metrics_sum_every_worker(tmp_path, monkeypatch):
+    monkeypatch.setattr(main, "METRICS_DIR", str(tmp_path))
+    hist = main.REQUEST_QUERIES
+    # another worker, long gone (no pid is above 2**22 on Linux), that saw 3 requests with 7 queries each
+    other = {
+        "pid": 2 ** 22 + 1,
+        "histograms": {hist.name: [[["elsewhere"], [0, 0, 0, 3, 0, 0, 0, 0], 3, 21.0]]},
+        "caches": {"sim": {"hits": 5, "misses": 2, "size": 40, "maxsize": 1024}},
+    }
+    (tmp_path / "gone.json").write_text(json.dumps(other))
+    hist.observe(("elsewhere",), 7)
+    mine = main.sim_cache.stats()
+
+    body = main.app.test_client().get("/metrics").get_data(as_text=True)
+    assert f'{hist.name}_count{{endpoint="elsewhere"}} 4' in body
+    assert f'{hist.name}_bucket{{endpoint="elsewhere",le="10"}} 4' in body
+    assert f"madfinance_sim_cache_hits_total {mine['hits'] + 5}" in body
+    assert f"madfinance_sim_cache_size {mine['size']}" in body  # the dead worker's cache went with it
+    assert os.path.exists(tmp_path / f"{os.getpid()}.json")
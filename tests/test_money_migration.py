@@ -0,0 +1,66 @@
+"""
+Old float-dollar strategy.db files migrate to integer cents with the same
+half-even rounding as every other dollars -> cents conversion.
+
+    python -m pytest tests
+"""
+import sqlite3
+
+import pytest
+from sqlalchemy import create_engine
+
+import main
+
+# binary-float ties: ROUND(x * 100) and int(round(x * 100)) disagree on some of these
+AMOUNTS = [2.675, 0.125, 1.005, 0.015, 10.45, 1234.565, 19.99, 0.0, 250.0]
+
+
+@pytest.fixture
+def float_db(tmp_path):
+    path = tmp_path / "old.db"
+    with sqlite3.connect(path) as conn:
+        conn.execute("CREATE TABLE debt (id INTEGER PRIMARY KEY, name VARCHAR(100) NOT NULL, "
+                     "balance FLOAT NOT NULL, interest_rate FLOAT NOT NULL, min_payment FLOAT NOT NULL)")
+        conn.execute("CREATE TABLE planned_payment (id INTEGER PRIMARY KEY, pay_date DATE NOT NULL, "
+                     "name VARCHAR(140) NOT NULL, amount FLOAT NOT NULL, kind VARCHAR(30) NOT NULL)")
+        conn.execute("CREATE INDEX ix_planned_payment_pay_date ON planned_payment (pay_date)")
+        for i, amount in enumerate(AMOUNTS, 1):
+            conn.execute("INSERT INTO debt VALUES (?, ?, ?, 19.99, ?)", (i, f"Card {i}", amount, amount))
+            conn.execute("INSERT INTO planned_payment VALUES (?, '2026-02-01', 'Rent', ?, 'bill')", (i, amount))
+    engine = create_engine(f"sqlite:///{path}")
+    yield engine
+    engine.dispose()
+
+
+def test_to_cents_is_half_even_on_the_decimal():
+    assert [main.to_cents(a) for a in AMOUNTS] == [268, 12, 100, 2, 1045, 123456, 1999, 0, 25000]
+    assert main.to_cents("0.005") == 0 and main.to_cents("0.015") == 2
+    assert main.to_units(19.995, main.APR_SCALE) == 199950
+    assert main.units_array([2.675, 0.125], 100).tolist() == [268, 12]
+    # long arrays take the vectorized route, which must round the same way
+    assert main.units_array(AMOUNTS * 3, 100).tolist() == [main.to_cents(a) for a in AMOUNTS] * 3
+
+
+def test_float_schema_migrates_to_cents(float_db):
+    main.init_schema(float_db)
+    with float_db.connect() as conn:
+        debts = conn.exec_driver_sql("SELECT balance, min_payment, typeof(balance) FROM debt ORDER BY id").all()
+        planned = conn.exec_driver_sql("SELECT amount FROM planned_payment ORDER BY id").scalars().all()
+        types = {c["name"]: c["type"] for c in main.db.inspect(conn).get_columns("debt")}
+        rollup = conn.exec_driver_sql("SELECT total, count FROM monthly_rollup WHERE month = '2026-02'").one()
+    expected = [main.to_cents(a) for a in AMOUNTS]
+    assert [b for b, _, _ in debts] == expected
+    assert [m for _, m, _ in debts] == expected
+    assert {t for _, _, t in debts} == {"integer"}
+    assert planned == expected
+    assert isinstance(types["balance"], main.db.Integer) and "variable_rate" in types
+    assert tuple(rollup) == (sum(expected), len(AMOUNTS))
+
+
+def test_migration_runs_once(float_db):
+    main.init_schema(float_db)
+    main.init_schema(float_db)
+    with float_db.connect() as conn:
+        assert conn.exec_driver_sql("SELECT balance FROM debt ORDER BY id").scalars().all() == [
+            main.to_cents(a) for a in AMOUNTS
+        ]
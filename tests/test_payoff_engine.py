@@ -0,0 +1,158 @@
+"""
+The vectorized payoff engines against the per-debt reference loop.
+
+    python -m pytest tests
+"""
+import random
+from datetime import date
+from decimal import Decimal
+
+import numpy as np
+import pytest
+
+import main
+
+EXTRAS = [0.0, 75.0, 600.0, 2500.0]
+
+
+def portfolio(seed, n, promos=True):
+    # like bench/suite.py's gen_debts, plus APR ties, priorities, promos and split shares
+    rng = random.Random(seed)
+    today = date.today()
+    debts = []
+    for i in range(n):
+        balance = round(rng.uniform(300, 25000), 2)
+        promo = promos and rng.random() < 0.3
+        debts.append(main.SweepDebt(
+            name=f"Debt {i:02d}",
+            balance=balance,
+            interest_rate=round(rng.choice([0.0, 18.0, rng.uniform(3, 12), rng.uniform(15, 32)]), 2),
+            min_payment=round(max(25.0, balance * rng.uniform(0.015, 0.04)), 2),
+            priority=rng.choice([None, 1, 2, 3]),
+            promo_rate=rng.choice([0.0, 2.9]) if promo else None,
+            promo_end=main.add_months(today, rng.randint(1, 24)) if promo else None,
+            split_pct=rng.choice([None, 10.0, 25.0, 50.0]),
+        ))
+    return debts
+
+
+PORTFOLIOS = {
+    "plain": portfolio(1, 12, promos=False),
+    "promo": portfolio(2, 12),
+    "wide": portfolio(3, 30),
+    # a card whose minimum doesn't cover its interest: never paid off without extra
+    "spiral": portfolio(4, 6) + [main.SweepDebt("Spiral", 20000.0, 29.99, 40.0, None, None, None, 20.0)],
+    # payments short of the first month's interest: infinite interest unless the extra is big
+    "underwater": [main.SweepDebt("Underwater", 50000.0, 30.0, 100.0, None, None, None, None),
+                   main.SweepDebt("Small", 800.0, 12.0, 25.0, None, None, None, None)],
+}
+
+
+@pytest.fixture(autouse=True)
+def fresh_cache():
+    main.sim_cache.clear()
+    yield
+    main.sim_cache.clear()
+
+
+@pytest.fixture(params=[False, True], ids=["stepped", "skipping"])
+def skipping(request, monkeypatch):
+    monkeypatch.setattr(main, "MONTH_SKIPPING", request.param)
+    return request.param
+
+
+@pytest.mark.parametrize("name", sorted(PORTFOLIOS))
+@pytest.mark.parametrize("method", list(main.STRATEGIES))
+def test_simulate_payoff_matches_reference(name, method, skipping):
+    debts = PORTFOLIOS[name]
+    for extra in EXTRAS:
+        for max_months in (600, 36):
+            main.sim_cache.clear()
+            expected = main.simulate_payoff_reference(debts, extra, method, max_months)
+            assert main.simulate_payoff(debts, extra, method, max_months) == expected, (extra, max_months)
+
+
+@pytest.mark.parametrize("name", sorted(PORTFOLIOS))
+def test_simulate_payoff_many_matches_single_runs(name, skipping):
+    debts = PORTFOLIOS[name]
+    methods = list(main.STRATEGIES)
+    many = main.simulate_payoff_many(debts, EXTRAS, methods)
+    for method in methods:
+        for extra, result in zip(EXTRAS, many[method]):
+            main.sim_cache.clear()
+            assert result == main.simulate_payoff(debts, extra, method), (method, extra)
+
+
+@pytest.mark.parametrize("name", sorted(PORTFOLIOS))
+@pytest.mark.parametrize("method", list(main.STRATEGIES))
+def test_timeline_matches_stepped_loop(name, method, monkeypatch):
+    debts = PORTFOLIOS[name]
+    for extra in EXTRAS:
+        monkeypatch.setattr(main, "MONTH_SKIPPING", True)
+        jumped = main.simulate_payoff_timeline(debts, extra, method)
+        monkeypatch.setattr(main, "MONTH_SKIPPING", False)
+        stepped = main.simulate_payoff_timeline(debts, extra, method)
+        assert jumped[:3] == stepped[:3]
+        assert np.array_equal(jumped[3], stepped[3]) and np.array_equal(jumped[4], stepped[4])
+
+
+def float_payoff(debts, extra_monthly, method, max_months=600, cents=False):
+    """
+    The engine before money went to integer cents: per-debt float loop, as it
+    was. cents=True charges each month's interest rounded half to even to the
+    cent, like the integer engine does, which is what its totals should match.
+    """
+    sim = [{"bal": float(d.balance), "apr": float(d.interest_rate) / 100.0, "min": float(d.min_payment),
+            "pct": Decimal(str(d.interest_rate))} for d in debts]
+
+    def sort_key(x):
+        if method == "snowball":
+            return (x["bal"], -x["apr"])
+        return (-x["apr"], x["bal"])
+
+    months, total_interest = 0, 0.0
+    if sum(d["min"] for d in sim) + max(extra_monthly, 0) <= sum(d["bal"] * (d["apr"] / 12) for d in sim):
+        return max_months, float("inf")
+    while any(d["bal"] > 0.01 for d in sim):
+        months += 1
+        if months > max_months:
+            return max_months, total_interest
+        for d in sim:
+            if d["bal"] <= 0:
+                continue
+            interest = d["bal"] * (d["apr"] / 12)
+            if cents:
+                interest = main.to_cents(Decimal(f"{d['bal']:.2f}") * d["pct"] / 1200) / 100
+            total_interest += interest
+            d["bal"] += interest
+        for d in sim:
+            if d["bal"] <= 0:
+                continue
+            d["bal"] -= min(d["min"], d["bal"])
+        extra = max(extra_monthly, 0.0)
+        while extra > 0.01 and any(d["bal"] > 0.01 for d in sim):
+            sim.sort(key=sort_key)
+            target = next(x for x in sim if x["bal"] > 0.01)
+            pay = min(extra, target["bal"])
+            target["bal"] -= pay
+            extra -= pay
+    return months, total_interest
+
+
+@pytest.mark.parametrize("method", ["avalanche", "snowball"])
+def test_integer_engine_matches_float_loop(method, skipping):
+    # same payoff month as the old float engine, and interest to the cent
+    rng = random.Random(5)
+    for case in range(60):
+        debts = portfolio(100 + case, rng.randint(1, 10), promos=False)
+        extra = rng.choice([0.0, 50.0, 300.0, 1000.0])
+        main.sim_cache.clear()
+        months, _, interest = main.simulate_payoff(debts, extra, method)
+        assert months == float_payoff(debts, extra, method)[0], (case, extra)
+        if months < 600:
+            assert interest == pytest.approx(float_payoff(debts, extra, method, cents=True)[1], abs=0.005), (case, extra)
+
+
+def test_empty_portfolio():
+    assert main.simulate_payoff([], 100.0) == main.simulate_payoff_reference([], 100.0) == (0, None, 0.0)
+    assert main.simulate_payoff_many([], [0.0, 100.0], ["avalanche"]) == {"avalanche": [(0, None, 0.0)] * 2}
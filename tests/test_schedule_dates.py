@@ -0,0 +1,93 @@
+"""
+Closed-form paycheck counts and lazy bill due dates against stepping through
+every date from the anchor.
+
+    python -m pytest tests
+"""
+import random
+from datetime import date, timedelta
+
+import pytest
+
+import main
+
+THIS_MONTH = date.today().replace(day=1)
+
+
+def due_dates(anchor, frequency, end):
+    # every date of the schedule from the anchor on, the slow way
+    k = 0
+    while True:
+        if frequency in main.PAY_PERIOD_DAYS:
+            d = anchor + timedelta(days=k * main.PAY_PERIOD_DAYS[frequency])
+        else:
+            d = main.add_months(anchor, k * main.BILL_PERIOD_MONTHS.get(frequency, 1))
+        if d > end:
+            return
+        yield d
+        k += 1
+
+
+def month(offset):
+    first = main.add_months(THIS_MONTH, offset)
+    return main.month_bounds(first.year, first.month)
+
+
+def cases(seed, n):
+    # anchors from ~3 years back to ~5 years ahead (so some fall after the month),
+    # months from this one out past 60 years, plenty of 29th-31st anchors
+    rng = random.Random(seed)
+    for _ in range(n):
+        anchor = THIS_MONTH + timedelta(days=rng.randint(-1100, 1800))
+        if rng.random() < 0.3:
+            anchor = date(anchor.year, rng.choice([1, 3, 5, 7, 8, 10, 12]), rng.randint(29, 31))
+        offset = rng.choice([0, 1, rng.randint(0, 120), rng.randint(600, 780)])
+        yield anchor, offset
+
+
+@pytest.mark.parametrize("frequency", ["Weekly", "Bi-weekly", "Monthly"])
+def test_paychecks_between_matches_stepping(frequency):
+    for anchor, offset in cases(1, 300):
+        start, end = month(offset)
+        expected = sum(1 for d in due_dates(anchor, frequency, end) if d >= start)
+        assert main.paychecks_between(anchor, frequency, start, end) == expected, (anchor, start)
+
+
+@pytest.mark.parametrize("frequency", ["Weekly", "Bi-weekly", "Monthly", "Quarterly", "Yearly"])
+def test_bill_occurrences_matches_stepping(frequency):
+    for anchor, offset in cases(2, 300):
+        start, end = month(offset)
+        expected = [d for d in due_dates(anchor, frequency, end) if d >= start]
+        assert list(main.bill_occurrences(anchor, frequency, start, end)) == expected, (anchor, start)
+
+
+def test_anchor_after_the_month():
+    start, end = month(0)
+    later = end + timedelta(days=1)
+    assert main.paychecks_between(later, "Weekly", start, end) == 0
+    assert main.paychecks_between(later, "Monthly", start, end) == 0
+    assert list(main.bill_occurrences(later, "Monthly", start, end)) == []
+    assert list(main.bill_occurrences(later, "Once", start, end)) == []
+
+
+def test_paychecks_fifty_years_out():
+    anchor = date(2024, 1, 5)  # a Friday
+    start, end = date(2074, 1, 1), date(2074, 1, 31)
+    fridays = [d for d in (start + timedelta(days=i) for i in range(31)) if d.weekday() == anchor.weekday()]
+    assert main.paychecks_between(anchor, "Weekly", start, end) == len(fridays)
+    assert main.paychecks_between(anchor, "Bi-weekly", start, end) == sum(
+        1 for d in fridays if (d - anchor).days % 14 == 0)
+    assert main.paychecks_between(anchor, "Monthly", start, end) == 1
+
+
+@pytest.mark.parametrize("day", [29, 30, 31])
+def test_month_end_bills_clamp_without_drifting(day):
+    anchor = date(2023, 1, day)
+    due = [next(main.bill_occurrences(anchor, "Monthly", *main.month_bounds(2023, m))) for m in range(1, 13)]
+    for m, d in enumerate(due, start=1):
+        assert d == date(2023, m, min(day, main.calendar.monthrange(2023, m)[1]))
+    # February 2024 is a leap month: the 29th fits, the 30th/31st clamp to it
+    assert list(main.bill_occurrences(anchor, "Monthly", date(2024, 2, 1), date(2024, 2, 29))) == [date(2024, 2, 29)]
+    # and a quarterly bill anchored on the 31st lands on each quarter's own month end
+    assert list(main.bill_occurrences(date(2023, 1, 31), "Quarterly", date(2023, 4, 1), date(2023, 4, 30))) == [
+        date(2023, 4, 30)]